@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Latency of :meth:`confspec.manager.ConfigMg.load` of a stack of layered
+files, sequential and parallel (see
+:meth:`confspec.manager.ConfigMg.enable_parallel_load`).
+
+Usage::
+
+    PYTHONPATH=lib python -m benchmarks.layers [--layers N] [--size N]
+        [--delay SECONDS] [--workers N] [--repeat N]
+
+Slow filesystems, like network mounts, are simulated by sleeping ``--delay``
+seconds every time the configuration manager opens a file. Each layer sets
+every option of a specification of ``--size`` options (see
+:mod:`benchmarks.specs`), alternating between two sets of values, and both
+loads are checked to give the same configuration.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import argparse
+from time import sleep
+from shutil import rmtree
+from tempfile import mkdtemp
+from timeit import default_timer
+from os.path import join
+
+from confspec import manager
+from confspec.manager import ConfigMg
+
+from .specs import make_spec, alternate_values
+
+
+def write_layers(size, directory, layers):
+    """
+    Write the layered files and return their paths.
+    """
+    spec = make_spec(size)
+    mgr = ConfigMg(spec, load=False, safe=False)
+    documents = [mgr.do_export()]
+    with mgr.transaction():
+        for key, value in alternate_values(spec).items():
+            mgr.set(key, value)
+    documents.append(mgr.do_export())
+
+    paths = []
+    for i in range(layers):
+        path = join(directory, 'layer{}.ini'.format(i))
+        with open(path, 'w') as fd:
+            fd.write(documents[i % 2])
+        paths.append(path)
+    return paths
+
+
+def measure(size, paths, workers, repeat):
+    """
+    Load the files ``repeat`` times and return the best time and the loaded
+    configuration.
+    """
+    best = None
+    for i in range(repeat):
+        # Options hold their values, so each load needs a new specification
+        mgr = ConfigMg(make_spec(size), files=paths, load=False, safe=False)
+        mgr.enable_parallel_load(bool(workers), workers=workers)
+        start = default_timer()
+        mgr.load()
+        elapsed = default_timer() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, dict(mgr.snapshot())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--layers', type=int, default=5)
+    parser.add_argument('--size', type=int, default=1000)
+    parser.add_argument('--delay', type=float, default=0.02)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    # Inject the latency of a slow filesystem
+    def slow_open(*fargs, **kwargs):
+        sleep(args.delay)
+        return open(*fargs, **kwargs)
+
+    manager.open = slow_open
+
+    directory = mkdtemp(prefix='confspec-bench-')
+    try:
+        paths = write_layers(args.size, directory, args.layers)
+
+        sequential, expected = measure(args.size, paths, None, args.repeat)
+        parallel, values = measure(args.size, paths, args.workers, args.repeat)
+        assert values == expected, 'Parallel load gave a different result.'
+    finally:
+        del manager.open
+        rmtree(directory)
+
+    print('{:<12} {:>10}'.format('load', 'time (ms)'))
+    print('{:<12} {:>10.3f}'.format('sequential', 1000 * sequential))
+    print('{:<12} {:>10.3f}'.format('parallel', 1000 * parallel))
+    print('\nSpeedup: {:.2f}x'.format(sequential / parallel))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""
+Memory used per configuration option, measured with :py:mod:`tracemalloc`.
+
+Usage::
+
+    PYTHONPATH=lib python -m benchmarks.memory [--options N]
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import argparse
+import tracemalloc
+
+from confspec.options import (
+    ConfigInt, ConfigHexadecimal, ConfigBoolean, ConfigFloat, ConfigLine,
+    ConfigDateTime, ConfigColor, ConfigListInt
+)
+
+
+FACTORIES = [
+    ('ConfigInt', lambda i: ConfigInt(key='k{}'.format(i), default=i)),
+    ('ConfigHexadecimal', lambda i: ConfigHexadecimal(
+        key='k{}'.format(i), default=i
+    )),
+    ('ConfigBoolean', lambda i: ConfigBoolean(
+        key='k{}'.format(i), default=True
+    )),
+    ('ConfigFloat', lambda i: ConfigFloat(key='k{}'.format(i), default=1.0)),
+    ('ConfigLine', lambda i: ConfigLine(key='k{}'.format(i), default='x')),
+    ('ConfigDateTime', lambda i: ConfigDateTime(
+        key='k{}'.format(i), default='2014-01-01T00:00:00'
+    )),
+    ('ConfigColor', lambda i: ConfigColor(
+        key='k{}'.format(i), default='#FFFFFF'
+    )),
+    ('ConfigListInt', lambda i: ConfigListInt(
+        key='k{}'.format(i), default=[]
+    )),
+]
+
+
+def bytes_per_option(factory, count):
+    """
+    Return the number of bytes allocated per option when creating ``count``
+    options with the given factory. The memory held by keys and values is
+    included.
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        options = [factory(i) for i in range(count)]
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    allocated = sum(
+        stat.size_diff for stat in after.compare_to(before, 'filename')
+    )
+    del options
+    return allocated / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--options', type=int, default=20000)
+    args = parser.parse_args()
+
+    print('{:<20} {:>14}'.format('option', 'bytes / option'))
+    for name, factory in FACTORIES:
+        print('{:<20} {:>14.1f}'.format(
+            name, bytes_per_option(factory, args.options)
+        ))
+
+
+if __name__ == '__main__':
+    main()
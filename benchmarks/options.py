@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""
+Per-assignment overhead of :attr:`confspec.options.ConfigOpt.value`.
+
+Usage::
+
+    PYTHONPATH=lib python -m benchmarks.options [--number N]
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import argparse
+from timeit import repeat
+from datetime import date
+
+from confspec.options import (
+    ConfigInt, ConfigBoolean, ConfigFloat, ConfigDate, ConfigListInt
+)
+from confspec.validation import positive, in_range, all_validate_to
+
+
+def cases():
+    """
+    Return a list of ``(name, option, value)`` to benchmark.
+    """
+    return [
+        ('int, no validator', ConfigInt(key='a', default=1), 5),
+        ('int, 1 validator', ConfigInt(
+            key='a', default=1, validator=positive()
+        ), 5),
+        ('int, 3 validators', ConfigInt(
+            key='a', default=1,
+            validator=[positive(), in_range(0, 10), in_range(1, 9)]
+        ), 5),
+        ('int from string', ConfigInt(
+            key='a', default=1, validator=positive()
+        ), '5'),
+        ('bool', ConfigBoolean(key='a', default=True), False),
+        ('float', ConfigFloat(
+            key='a', default=1.0, validator=in_range(0.0, 10.0)
+        ), 5.0),
+        ('date', ConfigDate(key='a', default='2014-01-01'), date.today()),
+        ('list of int', ConfigListInt(
+            key='a', default=[], validator=all_validate_to(positive())
+        ), [1, 2, 3]),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--number', type=int, default=200000)
+    args = parser.parse_args()
+
+    print('{:<20} {:>12}'.format('case', 'ns / set'))
+    for name, option, value in cases():
+        best = min(repeat(
+            'option.value = value',
+            globals={'option': option, 'value': value},
+            number=args.number, repeat=7
+        ))
+        print('{:<20} {:>12.1f}'.format(name, 1e9 * best / args.number))
+
+
+if __name__ == '__main__':
+    main()
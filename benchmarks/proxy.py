@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""
+Cost of reading a configuration key through the different access paths.
+
+Usage::
+
+    PYTHONPATH=lib python -m benchmarks.proxy [--number N]
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import argparse
+from timeit import repeat
+
+from confspec.manager import ConfigMg
+from confspec.options import ConfigInt
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--number', type=int, default=1000000)
+    args = parser.parse_args()
+
+    mgr = ConfigMg(
+        [ConfigInt(key='key{}'.format(i), default=i) for i in range(100)],
+        load=False
+    )
+    namespace = {
+        'mgr': mgr,
+        'proxy': mgr.get_proxy(),
+        'fast': mgr.get_proxy(fast=True),
+    }
+
+    print('{:<24} {:>12}'.format('access', 'ns / read'))
+    for name, stmt in [
+            ('ConfigMg.get()', 'mgr.get("key50")'),
+            ('ConfigProxy', 'proxy.key50'),
+            ('fast proxy', 'fast.key50')]:
+        best = min(repeat(
+            stmt, globals=namespace, number=args.number, repeat=5
+        ))
+        print('{:<24} {:>12.1f}'.format(name, 1e9 * best / args.number))
+
+
+if __name__ == '__main__':
+    main()
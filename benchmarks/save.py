@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""
+Latency of :meth:`confspec.manager.ConfigMg.save` for each fsync policy.
+
+Usage::
+
+    PYTHONPATH=lib python -m benchmarks.save [--options N] [--saves N] [DIR]
+
+``DIR`` is the directory where the configuration file is written. Use a
+directory on the file system you want to measure (defaults to a temporary
+directory).
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import argparse
+from shutil import rmtree
+from tempfile import mkdtemp
+from timeit import default_timer
+from os.path import join
+
+from confspec.manager import ConfigMg
+from confspec.options import ConfigInt
+
+
+def measure(mgr, saves):
+    """
+    Call ``mgr.save()`` ``saves`` times and return the sorted latencies.
+    """
+    latencies = []
+    for i in range(saves):
+        start = default_timer()
+        mgr.save()
+        latencies.append(default_timer() - start)
+    return sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--options', type=int, default=100)
+    parser.add_argument('--saves', type=int, default=200)
+    parser.add_argument('directory', nargs='?', default=None)
+    args = parser.parse_args()
+
+    directory = args.directory or mkdtemp(prefix='confspec-bench-')
+    path = join(directory, 'bench.ini')
+
+    try:
+        print('{:<12} {:>10} {:>10} {:>10}'.format(
+            'fsync', 'mean (ms)', 'p50 (ms)', 'p99 (ms)'
+        ))
+        for fsync in ['never', 'file', 'directory']:
+            spec = [
+                ConfigInt(key='key{}'.format(i), default=i)
+                for i in range(args.options)
+            ]
+            mgr = ConfigMg(
+                spec, files=[path], load=False, safe=False, fsync=fsync
+            )
+            latencies = measure(mgr, args.saves)
+            print('{:<12} {:>10.3f} {:>10.3f} {:>10.3f}'.format(
+                fsync,
+                1000 * sum(latencies) / len(latencies),
+                1000 * latencies[len(latencies) // 2],
+                1000 * latencies[int(len(latencies) * 0.99)],
+            ))
+    finally:
+        if args.directory is None:
+            rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
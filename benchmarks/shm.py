@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+
+"""
+Cost of starting a worker by loading the configuration files versus
+subscribing to a configuration published in shared memory.
+
+Usage::
+
+    PYTHONPATH=lib python -m benchmarks.shm [--options N] [--number N]
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import argparse
+from shutil import rmtree
+from tempfile import mkdtemp
+from timeit import default_timer
+from os.path import join
+
+from confspec.manager import ConfigMg
+from confspec.options import ConfigInt, ConfigLine
+
+
+def make_spec(options):
+    spec = []
+    for i in range(options // 2):
+        spec.append(ConfigInt(key='int{}'.format(i), default=i))
+        spec.append(ConfigLine(key='line{}'.format(i), default='line'))
+    return spec
+
+
+def best(function, number):
+    """
+    Return the best time of ``number`` calls to ``function``.
+    """
+    times = []
+    for i in range(number):
+        start = default_timer()
+        function()
+        times.append(default_timer() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--options', type=int, default=1000)
+    parser.add_argument('--number', type=int, default=20)
+    args = parser.parse_args()
+
+    directory = mkdtemp(prefix='confspec-bench-')
+    path = join(directory, 'bench.ini')
+    try:
+        publisher = ConfigMg(make_spec(args.options), files=[path])
+        with publisher.transaction():
+            for i in range(args.options // 2):
+                publisher.set('int{}'.format(i), i + 1)
+        shm = publisher.publish()
+
+        def construct():
+            ConfigMg(make_spec(args.options), load=False)
+
+        def load():
+            ConfigMg(make_spec(args.options), files=[path], create=False)
+
+        def subscribe():
+            ConfigMg(make_spec(args.options), load=False).subscribe(shm.name)
+
+        print('{:<12} {:>10}'.format('startup', 'best (ms)'))
+        for name, function in [
+                ('construct', construct),
+                ('load', load),
+                ('subscribe', subscribe)]:
+            print('{:<12} {:>10.3f}'.format(
+                name, 1000 * best(function, args.number)
+            ))
+        shm.close()
+    finally:
+        rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
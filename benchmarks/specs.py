@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+
+"""
+Synthetic configuration specifications for the benchmarks.
+
+Specifications cycle through every :class:`confspec.options.ConfigOpt` type,
+with options grouped in categories of 100 keys. Not covered are
+:class:`confspec.options.ConfigFont` when PyGObject is not installed, and
+:class:`confspec.options.ConfigListMap` and
+:class:`confspec.options.ConfigListClass`, whose values can't be read as
+their elements are returned by the ``value`` getter of
+:class:`confspec.options.ConfigMap`.
+
+>>> from benchmarks.specs import make_spec
+>>> spec = make_spec(1000)
+>>> len(spec), len(set(opt.category for opt in spec))
+(1000, 10)
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from os import getcwd
+from os.path import abspath, dirname, join
+
+from confspec import options
+
+
+__all__ = ['TYPES', 'make_spec', 'default_values', 'alternate_values']
+
+
+HERE = abspath(dirname(__file__))
+CLASSES = [int, float, str]
+
+
+def _types():
+    """
+    Return the list of ``(class, kwargs, default, alternate)`` used to
+    generate options.
+    """
+    types = [
+        (options.ConfigString, {}, '"string"', '"other string"'),
+        (options.ConfigText, {}, 'text', 'other text'),
+        (options.ConfigLine, {}, 'line', 'other line'),
+        (options.ConfigInt, {}, 10, 20),
+        (options.ConfigDecimal, {}, 10, 20),
+        (options.ConfigOctal, {}, 8, 16),
+        (options.ConfigHexadecimal, {}, 16, 32),
+        (options.ConfigBoolean, {}, True, False),
+        (options.ConfigFloat, {}, 1.5, 2.5),
+        (
+            options.ConfigDateTime, {},
+            '2014-09-30T17:40:20', '2015-01-01T00:00:00'
+        ),
+        (options.ConfigDate, {}, '2014-09-30', '2015-01-01'),
+        (options.ConfigTime, {}, '17:40:20', '08:00:00'),
+        (
+            options.ConfigMap, {'table': {'one': 1, 'two': 2}},
+            'one', 'two'
+        ),
+        (options.ConfigClass, {'classes': CLASSES}, 'int', 'str'),
+        (options.ConfigPath, {}, getcwd(), HERE),
+        (
+            options.ConfigFile, {},
+            join(HERE, '__init__.py'), join(HERE, 'specs.py')
+        ),
+        (options.ConfigDir, {}, getcwd(), HERE),
+        (options.ConfigColor, {}, '#FFFFFF', '#000000'),
+        (options.ConfigListString, {}, ['"a"', '"b"'], ['"c"']),
+        (options.ConfigListText, {}, ['a b', 'c'], ['d']),
+        (options.ConfigListLine, {}, ['a', 'b'], ['c']),
+        (options.ConfigListInt, {}, [1, 2, 3], [4, 5]),
+        (options.ConfigListDecimal, {}, [1, 2, 3], [4, 5]),
+        (options.ConfigListOctal, {}, [8, 16], [24]),
+        (options.ConfigListHexadecimal, {}, [16, 32], [48]),
+        (options.ConfigListBoolean, {}, [True, False], [False]),
+        (options.ConfigListFloat, {}, [1.5, 2.5], [3.5]),
+        (
+            options.ConfigListDateTime, {},
+            ['2014-09-30T17:40:20'], ['2015-01-01T00:00:00']
+        ),
+        (options.ConfigListDate, {}, ['2014-09-30'], ['2015-01-01']),
+        (options.ConfigListTime, {}, ['17:40:20'], ['08:00:00']),
+        (options.ConfigListPath, {}, [getcwd()], [HERE]),
+        (
+            options.ConfigListFile, {},
+            [join(HERE, '__init__.py')], [join(HERE, 'specs.py')]
+        ),
+        (options.ConfigListDir, {}, [getcwd()], [HERE]),
+        (options.ConfigListColor, {}, ['#FFFFFF'], ['#000000']),
+    ]
+
+    try:
+        options.ConfigFont(key='font', default='Sans 12')
+    except ImportError:
+        pass
+    else:
+        types.append((options.ConfigFont, {}, 'Sans 12', 'Sans 14'))
+        types.append((options.ConfigListFont, {}, ['Sans 12'], ['Sans 14']))
+
+    return types
+
+
+TYPES = _types()
+"""
+List of ``(class, kwargs, default, alternate)`` of the generated options.
+"""
+
+
+def make_spec(size, types=TYPES):
+    """
+    Create a specification of ``size`` options, cycling through ``types``.
+
+    Keys are named after their type and index, like ``configint_3``, and
+    options are grouped in categories of 100 keys.
+    """
+    spec = []
+    for i in range(size):
+        cls, kwargs, default, alternate = types[i % len(types)]
+        spec.append(cls(
+            key='{}_{}'.format(cls.__name__.lower(), i),
+            default=default,
+            category='category_{}'.format(i // 100),
+            comment='Option {} of type {}.'.format(i, cls.__name__),
+            **kwargs
+        ))
+    return spec
+
+
+def default_values(spec, types=TYPES):
+    """
+    Return a mapping of each key of a specification created with
+    :func:`make_spec` to its default value, as given to the option.
+    """
+    defaults = {cls: default for cls, _, default, _ in types}
+    return {opt.key: defaults[type(opt)] for opt in spec}
+
+
+def alternate_values(spec, types=TYPES):
+    """
+    Return a mapping of each key of a specification created with
+    :func:`make_spec` to a valid value different from its default.
+    """
+    alternates = {cls: alternate for cls, _, _, alternate in types}
+    return {opt.key: alternates[type(opt)] for opt in spec}
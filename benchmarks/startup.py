@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Benchmark of the time taken by ``import confspec``.
+
+Usage::
+
+    PYTHONPATH=lib python -m benchmarks.startup [--module confspec]
+        [--repeat N] [--top N] [--save FILE] [--compare FILE]
+        [--threshold RATIO]
+
+Each repetition imports the module in a fresh interpreter with
+``-X importtime``, and the median of the cumulative import times is reported
+along with the modules that take the most time themselves. Bytecode is
+compiled beforehand into a temporary cache, so compilation is not measured.
+
+The benchmark also fails if importing the module loads any of the
+``FORBIDDEN`` modules, which are only needed by specific option types,
+providers or features and must be imported the first time they're used.
+
+Use ``--save`` to store the result as a baseline, and ``--compare`` to
+compare against one: the benchmark exits with status 1 if the import is
+slower than ``--threshold`` times the baseline.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+from shutil import rmtree
+from tempfile import mkdtemp
+from statistics import median
+from platform import python_version
+
+
+# Modules that importing confspec must not load
+FORBIDDEN = [
+    'ast', 'fnmatch', 'hashlib', 'inspect', 'json', 'logging', 'pprint',
+    're', 'traceback',
+]
+
+
+def run(module, cache, *options):
+    """
+    Import the module in a fresh interpreter and return its standard error
+    and output.
+    """
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    process = subprocess.Popen(
+        [sys.executable, '-X', 'pycache_prefix={}'.format(cache)] +
+        list(options) + [
+            '-c',
+            'import sys, {0}; '
+            'print("\\n".join(sys.modules))'.format(module),
+        ],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True
+    )
+    stdout, stderr = process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(stderr)
+    return stderr, stdout
+
+
+def parse_importtime(output):
+    """
+    Parse the output of ``-X importtime``.
+
+    :rtype: A dictionary mapping the name of each imported module to its self
+     and cumulative import time in microseconds.
+    """
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            # Header line
+            continue
+        times[fields[2].strip()] = (self_us, cumulative_us)
+    return times
+
+
+def measure(module, repeat):
+    """
+    Import the module ``repeat`` times.
+
+    :rtype: A tuple with the median cumulative import time of the module in
+     microseconds, the median self time of each imported module and the set
+     of modules loaded by the import.
+    """
+    cache = mkdtemp(prefix='confspec-bench-')
+    try:
+        # Fill the bytecode cache
+        modules = set(run(module, cache)[1].splitlines())
+
+        samples = [
+            parse_importtime(run(module, cache, '-X', 'importtime')[0])
+            for i in range(repeat)
+        ]
+    finally:
+        rmtree(cache)
+
+    total = median(sample[module][1] for sample in samples)
+    selves = {
+        name: median(sample.get(name, (0, 0))[0] for sample in samples)
+        for name in samples[0]
+    }
+    return total, selves, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--module', default='confspec')
+    parser.add_argument('--repeat', type=int, default=15)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--save', metavar='FILE')
+    parser.add_argument('--compare', metavar='FILE')
+    parser.add_argument('--threshold', type=float, default=0.25)
+    args = parser.parse_args()
+
+    total, selves, modules = measure(args.module, args.repeat)
+
+    print('{:<40} {:>10}'.format('module', 'self (us)'))
+    top = sorted(selves.items(), key=lambda item: item[1], reverse=True)
+    for name, self_us in top[:args.top]:
+        print('{:<40} {:>10.0f}'.format(name, self_us))
+    print('\nimport {}: {:.0f} us'.format(args.module, total))
+
+    status = 0
+    loaded = sorted(set(FORBIDDEN) & modules)
+    if loaded:
+        print('\nForbidden modules imported: {}'.format(', '.join(loaded)))
+        status = 1
+
+    if args.save:
+        with open(args.save, 'w') as fd:
+            json.dump({
+                'python': python_version(),
+                'module': args.module,
+                'total': total,
+            }, fd, indent=4, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as fd:
+            baseline = json.load(fd)['total']
+        ratio = total / baseline if baseline else 1.0
+        regressed = ratio > 1 + args.threshold
+        print('\n{:.2f}x the baseline: {}'.format(
+            ratio, 'REGRESSION' if regressed else 'ok'
+        ))
+        if regressed:
+            status = 1
+
+    sys.exit(status)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,372 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+
+"""
+Benchmark suite of the configuration manager operations across format
+providers and specification sizes.
+
+Usage::
+
+    PYTHONPATH=lib python -m benchmarks [--sizes 10,1k,100k,1m]
+        [--formats ini,json,dict] [--operations construct,import,...]
+        [--repeat N] [--save FILE] [--compare FILE] [--threshold RATIO]
+
+For each specification size (see :mod:`benchmarks.specs`) the suite
+measures the best time of ``--repeat`` runs and the peak memory allocated
+(using :py:mod:`tracemalloc`) by each operation:
+
+``construct``
+    Create a :class:`confspec.manager.ConfigMg`.
+
+``import`` / ``export`` / ``load``
+    :meth:`confspec.manager.ConfigMg.do_import`,
+    :meth:`confspec.manager.ConfigMg.do_export` and
+    :meth:`confspec.manager.ConfigMg.load`, once per format. Imports and loads
+    change every value, and exports render every option again.
+
+``parse``
+    :meth:`confspec.manager.ConfigMg.do_import` of a document whose
+    categories are all unknown to the specification, once per format. It
+    measures the parser alone, as every option is skipped.
+
+``validate``
+    :meth:`confspec.manager.ConfigMg.validate` of a document that changes
+    every value, once per format.
+
+``set`` / ``get`` / ``proxy``
+    :meth:`confspec.manager.ConfigMg.set`,
+    :meth:`confspec.manager.ConfigMg.get` and reads through the fast proxy,
+    of up to 10000 keys. Times are per key.
+
+Use ``--save`` to store the results as a baseline, and ``--compare`` to
+compare against one: the suite exits with status 1 if any operation is
+slower, or allocates more memory, than ``--threshold`` times the baseline.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import sys
+import json
+import logging
+import argparse
+import tracemalloc
+from shutil import rmtree
+from tempfile import mkdtemp
+from timeit import default_timer
+from os.path import join
+from platform import python_version
+
+from confspec.manager import ConfigMg
+
+from .specs import make_spec, default_values, alternate_values
+
+
+OPERATIONS = [
+    'construct', 'import', 'export', 'load', 'parse', 'validate', 'set',
+    'get', 'proxy',
+]
+FORMATS = ['ini', 'json', 'dict']
+
+# Number of keys used by the per key operations
+KEYS = 10000
+
+# Minimum number of seconds measured by each repetition
+MIN_TIME = 0.05
+
+# Memory differences below this number of bytes are never regressions
+MEMORY_NOISE = 64 * 1024
+
+
+class Case(object):
+    """
+    A measured operation.
+
+    Each repetition runs the operation as many times as needed to measure at
+    least ``MIN_TIME`` seconds, and the best average is reported.
+
+    :param str name: Name of the case, like ``import/ini/1000``.
+    :param function run: Function that performs the operation.
+    :param function setup: Function called, untimed, before each run.
+    :param int calls: Number of calls performed by each run, to report the
+     time per call.
+    """
+
+    def __init__(self, name, run, setup=None, calls=1):
+        self.name = name
+        self.run = run
+        self.setup = setup
+        self.calls = calls
+
+    def measure(self, repeat):
+        """
+        Return the best time per call in seconds, and the peak memory in bytes
+        allocated by a run.
+        """
+        best = None
+        for i in range(repeat):
+            # Average as many runs as needed to reach the minimum time
+            total = 0.0
+            runs = 0
+            while total < MIN_TIME:
+                if self.setup is not None:
+                    self.setup()
+                start = default_timer()
+                self.run()
+                total += default_timer() - start
+                runs += 1
+
+            elapsed = total / runs
+            if best is None or elapsed < best:
+                best = elapsed
+
+        if self.setup is not None:
+            self.setup()
+        tracemalloc.start()
+        try:
+            self.run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        return best / self.calls, peak
+
+
+class Toggle(object):
+    """
+    Switch between two states, so each run of a case changes the
+    configuration.
+    """
+
+    def __init__(self):
+        self.state = False
+
+    def __call__(self):
+        self.state = not self.state
+        return self.state
+
+
+def make_cases(size, formats, operations, directory):
+    """
+    Generate the cases for the given specification size.
+    """
+    spec = make_spec(size)
+    defaults = default_values(spec)
+    alternates = alternate_values(spec)
+    mgr = ConfigMg(spec, load=False, safe=False)
+    keys = [opt.key for opt in spec[:KEYS]]
+
+    # Documents with the default and the alternate values in each format
+    documents = {}
+    for format in formats:
+        original = mgr.do_export(format=format)
+        with mgr.transaction():
+            for key, value in alternates.items():
+                mgr.set(key, value)
+        documents[format] = (original, mgr.do_export(format=format))
+        mgr.do_import(original, format=format)
+
+    # Documents with every category unknown to the specification
+    foreign = {}
+    if 'parse' in operations:
+        other = make_spec(size)
+        for opt in other:
+            opt.category = 'foreign_{}'.format(opt.category)
+        other_mgr = ConfigMg(other, load=False, safe=False)
+        for format in formats:
+            foreign[format] = other_mgr.do_export(format=format)
+
+    toggle = Toggle()
+
+    def swap(format):
+        mgr.do_import(documents[format][toggle()], format=format)
+
+    if 'construct' in operations:
+        yield Case(
+            'construct', lambda: ConfigMg(spec, load=False, safe=False)
+        )
+
+    for format in formats:
+        if 'import' in operations:
+            yield Case(
+                'import/{}'.format(format),
+                lambda format=format: swap(format)
+            )
+
+        if 'export' in operations:
+            yield Case(
+                'export/{}'.format(format),
+                lambda format=format: mgr.do_export(format=format),
+                setup=lambda format=format: swap(format)
+            )
+
+        if 'load' in operations:
+            path = join(directory, 'bench.{}'.format(format))
+            loader = ConfigMg(
+                spec, files=[path], format=format, create=False, load=False,
+                safe=False
+            )
+
+            def write(format=format, path=path):
+                with open(path, 'w') as fd:
+                    fd.write(documents[format][toggle()])
+
+            yield Case('load/{}'.format(format), loader.load, setup=write)
+
+        if 'parse' in operations:
+            def parse(format=format):
+                # Unknown categories are reported as errors
+                logging.disable(logging.ERROR)
+                try:
+                    mgr.do_import(foreign[format], format=format)
+                finally:
+                    logging.disable(logging.NOTSET)
+
+            yield Case('parse/{}'.format(format), parse)
+
+        if 'validate' in operations:
+            yield Case(
+                'validate/{}'.format(format),
+                lambda format=format: mgr.validate(
+                    documents[format][1], format=format
+                )
+            )
+
+    if 'set' in operations:
+        values = [(key, alternates[key], defaults[key]) for key in keys]
+
+        def set_keys():
+            index = 1 if toggle() else 2
+            for value in values:
+                mgr.set(value[0], value[index])
+
+        yield Case('set', set_keys, calls=len(keys))
+
+    if 'get' in operations:
+        def get_keys():
+            get = mgr.get
+            for key in keys:
+                get(key)
+
+        yield Case('get', get_keys, calls=len(keys))
+
+    if 'proxy' in operations:
+        proxy = mgr.get_proxy(fast=True)
+        getters = [
+            (lambda proxy, key=key: getattr(proxy, key)) for key in keys
+        ]
+
+        def read_proxy():
+            for getter in getters:
+                getter(proxy)
+
+        yield Case('proxy', read_proxy, calls=len(keys))
+
+
+def parse_size(size):
+    """
+    Parse a size like ``100``, ``10k`` or ``1m``.
+    """
+    size = size.strip().lower()
+    multiplier = {'k': 1000, 'm': 1000000}.get(size[-1:], 1)
+    if multiplier != 1:
+        size = size[:-1]
+    return int(size) * multiplier
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare the results against a baseline.
+
+    :rtype: List of the names of the cases that regressed.
+    """
+    regressions = []
+    print()
+    print('{:<24} {:>10} {:>10}  {}'.format(
+        'case', 'time', 'memory', 'status'
+    ))
+    for name, (elapsed, peak) in sorted(results.items()):
+        if name not in baseline:
+            continue
+        base_elapsed, base_peak = baseline[name]
+
+        time_ratio = elapsed / base_elapsed if base_elapsed else 1.0
+        memory_ratio = peak / base_peak if base_peak else 1.0
+        regressed = time_ratio > 1 + threshold or (
+            memory_ratio > 1 + threshold and peak - base_peak > MEMORY_NOISE
+        )
+        if regressed:
+            regressions.append(name)
+
+        print('{:<24} {:>9.2f}x {:>9.2f}x  {}'.format(
+            name, time_ratio, memory_ratio,
+            'REGRESSION' if regressed else 'ok'
+        ))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', default='10,1k,100k')
+    parser.add_argument('--formats', default=','.join(FORMATS))
+    parser.add_argument('--operations', default=','.join(OPERATIONS))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--save', metavar='FILE')
+    parser.add_argument('--compare', metavar='FILE')
+    parser.add_argument('--threshold', type=float, default=0.25)
+    args = parser.parse_args()
+
+    sizes = [parse_size(size) for size in args.sizes.split(',')]
+    formats = args.formats.split(',')
+    operations = args.operations.split(',')
+
+    results = {}
+    directory = mkdtemp(prefix='confspec-bench-')
+    try:
+        print('{:<24} {:>14} {:>14}'.format('case', 'time (us)', 'peak (KiB)'))
+        for size in sizes:
+            for case in make_cases(size, formats, operations, directory):
+                name = '{}/{}'.format(case.name, size)
+                elapsed, peak = case.measure(args.repeat)
+                results[name] = (elapsed, peak)
+                print('{:<24} {:>14.3f} {:>14.1f}'.format(
+                    name, 1e6 * elapsed, peak / 1024
+                ))
+                sys.stdout.flush()
+    finally:
+        rmtree(directory)
+
+    if args.save:
+        with open(args.save, 'w') as fd:
+            json.dump({
+                'python': python_version(),
+                'results': results,
+            }, fd, indent=4, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as fd:
+            baseline = json.load(fd)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print('\n{} regression(s) above {:.0%}.'.format(
+                len(regressions), args.threshold
+            ))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+
+"""
+Read throughput of the configuration manager under concurrent threads.
+
+Each thread reads keys through the given access path while a writer thread
+keeps changing the configuration. On free-threaded builds of Python the
+throughput should scale with the number of threads.
+
+Usage::
+
+    PYTHONPATH=lib python -m benchmarks.threads [--reads N] [--threads 1,2,4]
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import argparse
+import sys
+from threading import Event, Thread
+from timeit import default_timer
+
+from confspec.manager import ConfigMg
+from confspec.options import ConfigInt
+
+
+READERS = {
+    'get': lambda mgr: mgr.get('key50'),
+    'snapshot': lambda mgr: mgr.snapshot().key50,
+    'export': lambda mgr: mgr.do_export(),
+}
+
+
+def run(mgr, read, threads, reads):
+    """
+    Run given number of reader threads and return the reads per second.
+    """
+    stop = Event()
+
+    def writer():
+        value = 0
+        while not stop.is_set():
+            value = (value + 1) % 1000
+            mgr.set('key0', value)
+
+    def reader():
+        for i in range(reads):
+            read(mgr)
+
+    workers = [Thread(target=reader) for i in range(threads)]
+    background = Thread(target=writer)
+    background.start()
+
+    start = default_timer()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = default_timer() - start
+
+    stop.set()
+    background.join()
+    return threads * reads / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--reads', type=int, default=100000)
+    parser.add_argument('--threads', default='1,2,4,8')
+    parser.add_argument(
+        '--reader', choices=sorted(READERS), action='append'
+    )
+    args = parser.parse_args()
+
+    mgr = ConfigMg(
+        [ConfigInt(key='key{}'.format(i), default=i) for i in range(100)],
+        load=False
+    )
+
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print('GIL enabled: {}'.format(gil))
+    print('{:<12} {:>8} {:>16}'.format('reader', 'threads', 'reads / s'))
+    for name in args.reader or sorted(READERS):
+        reads = args.reads
+        if name == 'export':
+            reads = max(1, reads // 100)
+        for threads in map(int, args.threads.split(',')):
+            rate = run(mgr, READERS[name], threads, reads)
+            print('{:<12} {:>8} {:>16.0f}'.format(name, threads, rate))
+
+
+if __name__ == '__main__':
+    main()
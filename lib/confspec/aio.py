@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""
+Module for asyncio support.
+
+This module requires Python 3.7 or newer and is only imported when the
+asyncio features of confspec are used.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import asyncio
+import logging as log
+from traceback import format_exc, format_exception
+
+from .watcher import FileWatcher, _detector
+
+
+__all__ = ['AsyncFileWatcher', 'aload', 'asave', 'aset']
+
+
+# Tasks of coroutine listeners still running
+_tasks = set()
+
+
+def _running_loop():
+    """
+    Return the event loop running in the current thread, or ``None``.
+    """
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def bind(cfmg):
+    """
+    Bind the configuration manager to the running event loop, if it isn't
+    bound yet. Coroutine listeners run as tasks of that event loop.
+    """
+    if cfmg._loop is None:
+        cfmg._loop = _running_loop()
+    return cfmg._loop
+
+
+def schedule(cfmg, coro):
+    """
+    Schedule the coroutine returned by a listener in the event loop of the
+    configuration manager.
+
+    From the event loop thread the coroutine is run as a task; from any other
+    thread it is submitted thread safely.
+    """
+    loop = _running_loop()
+    if loop is None or loop is not bind(cfmg):
+        loop = cfmg._loop
+        if loop is None or loop.is_closed():
+            coro.close()
+            raise RuntimeError(
+                'No event loop to run coroutine listener {!r}.'.format(coro)
+            )
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+    else:
+        future = loop.create_task(coro)
+
+    _tasks.add(future)
+    future.add_done_callback(_done)
+
+
+def _done(future):
+    """
+    Log errors of a coroutine listener.
+    """
+    _tasks.discard(future)
+    if not future.cancelled() and future.exception() is not None:
+        exc = future.exception()
+        log.error(''.join(
+            format_exception(type(exc), exc, exc.__traceback__)
+        ))
+
+
+async def aload(cfmg):
+    """
+    Coroutine of :meth:`confspec.manager.ConfigMg.aload`.
+    """
+    loop = asyncio.get_event_loop()
+    bind(cfmg)
+    await loop.run_in_executor(None, cfmg.load)
+
+
+async def asave(cfmg):
+    """
+    Coroutine of :meth:`confspec.manager.ConfigMg.asave`.
+    """
+    loop = asyncio.get_event_loop()
+    bind(cfmg)
+    await loop.run_in_executor(None, cfmg.save)
+
+
+async def aset(cfmg, key, value):
+    """
+    Coroutine of :meth:`confspec.manager.ConfigMg.aset`.
+    """
+    from .manager import _UNCHANGED
+
+    loop = asyncio.get_event_loop()
+    bind(cfmg)
+
+    # Apply the change in the event loop thread only if the lock is free,
+    # waiting for other writers would stall the loop
+    lock = cfmg._lock
+    if lock.acquire_write(blocking=False):
+        try:
+            applied = cfmg._apply(key, value)
+        finally:
+            lock.release_write()
+    else:
+        applied = await loop.run_in_executor(None, cfmg._apply, key, value)
+
+    if applied is _UNCHANGED:
+        return
+    old_value, new_value, generation = applied
+
+    # Writeback if enabled
+    if cfmg._writeback:
+        await loop.run_in_executor(None, cfmg._request_save)
+
+    # Notify all listeners of the change
+    if cfmg._notify:
+        cfmg._notify_listeners(key, old_value, value)
+        cfmg._notify_batch([(key, old_value, new_value)], generation)
+
+
+class AsyncFileWatcher(FileWatcher):
+    """
+    asyncio variant of :class:`confspec.watcher.FileWatcher`.
+
+    The watcher runs as a task of the running event loop. When inotify is
+    used its file descriptor is watched by the event loop, and files are
+    reloaded in the default executor of the loop so the loop is never blocked
+    by file I/O.
+
+    Parameters are the same of :class:`confspec.watcher.FileWatcher`.
+    """
+
+    def __init__(self, cfmg, **kwargs):
+        super(AsyncFileWatcher, self).__init__(cfmg, **kwargs)
+        self._task = None
+        self._event = None
+
+    @property
+    def running(self):
+        """
+        ``True`` if the watcher task is running.
+        """
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """
+        Start watching the files in a task of the running event loop.
+        """
+        if self.running:
+            raise RuntimeError('Watcher is already running.')
+
+        loop = asyncio.get_event_loop()
+        self._detector = _detector(self._cfmg._files, self._use_inotify)
+        if self._detector.blocking:
+            self._event = asyncio.Event()
+            loop.add_reader(self._detector.fileno(), self._event.set)
+        self._task = loop.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stop watching the files and wait for the watcher task to finish.
+        """
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        if self._detector.blocking:
+            asyncio.get_event_loop().remove_reader(self._detector.fileno())
+            self._event = None
+        self._detector.close()
+        self._detector = None
+
+    async def _run(self):
+        """
+        Watcher task main loop.
+        """
+        loop = asyncio.get_event_loop()
+        schedule = self._schedule
+        blocking = self._detector.blocking
+
+        while True:
+            changed = await self._wait(schedule.timeout(blocking))
+            if schedule.step(changed):
+                try:
+                    await loop.run_in_executor(None, self._cfmg.reload)
+                except Exception:
+                    log.error(format_exc())
+
+    async def _wait(self, timeout):
+        """
+        Wait up to ``timeout`` seconds and check if any file changed.
+        """
+        if not self._detector.blocking:
+            await asyncio.sleep(timeout)
+            return self._detector.check()
+
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self._event.clear()
+        return self._detector.check()
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+
+"""
+Module for the listener dispatcher.
+
+This module requires :py:mod:`concurrent.futures` (available as the
+``futures`` package for Python 2.7) and is only imported when listener
+dispatch is enabled.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import atexit
+import logging as log
+from time import time
+from traceback import format_exc
+from collections import deque
+from threading import Condition, Event, Thread
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from time import monotonic
+except ImportError:
+    monotonic = time
+
+
+__all__ = ['ListenerDispatcher']
+
+
+class ListenerDispatcher(object):
+    """
+    Dispatcher that calls listeners in a pool of threads.
+
+    Notifications are queued in a lane per key (batch notifications share
+    their own lane), and each lane is drained by a single worker at a time, so
+    the listeners of a key are always called in the order the changes
+    happened, while listeners of different keys run concurrently.
+
+    When a ``timeout`` is given, each listener call runs in a thread of its
+    own and the lane moves on after the call ran for ``timeout`` seconds.
+    Python threads can't be interrupted, so a listener that timed out keeps
+    running in the background, but it no longer delays the following
+    notifications, of its key or of any other.
+
+    :meth:`stop` is registered to be called at interpreter exit so pending
+    notifications are delivered.
+
+    :param function call: Function that calls a listener, with signature
+     ``call(listener, *args)``.
+    :param int workers: Number of worker threads.
+    :param float timeout: Maximum number of seconds to wait for a listener
+     call, or ``None`` to wait for as long as needed.
+    """
+
+    def __init__(self, call, workers=4, timeout=None):
+        self._call = call
+        self._timeout = timeout
+
+        self._lanes_pool = ThreadPoolExecutor(max_workers=workers)
+
+        self._condition = Condition()
+        self._running = True
+        self._lanes = {}
+        self._pending = 0
+
+        self._dispatched = 0
+        self._completed = 0
+        self._failed = 0
+        self._timeouts = 0
+        self._total_time = 0.0
+        self._max_time = 0.0
+
+        atexit.register(self.stop)
+
+    def dispatch(self, lane, listeners, args):
+        """
+        Queue a call to each of the given listeners with the given arguments
+        in the given lane.
+
+        :param lane: Hashable name of the lane, usually the changed key.
+        :param tuple listeners: Listeners to call.
+        :param tuple args: Arguments to call the listeners with.
+        """
+        with self._condition:
+            if not self._running:
+                raise RuntimeError('Dispatcher is stopped.')
+
+            queue = self._lanes.get(lane)
+            start = queue is None
+            if start:
+                queue = self._lanes[lane] = deque()
+
+            for listener in listeners:
+                queue.append((listener, args))
+            self._pending += len(listeners)
+            self._dispatched += len(listeners)
+
+        if start:
+            self._lanes_pool.submit(self._drain, lane)
+
+    def wait(self, timeout=None):
+        """
+        Wait until all queued notifications are delivered.
+
+        :param float timeout: Maximum number of seconds to wait, or ``None``
+         to wait for as long as needed.
+        :rtype: ``True`` if all notifications were delivered, ``False`` if
+         the timeout expired.
+        """
+        with self._condition:
+            deadline = None
+            if timeout is not None:
+                deadline = monotonic() + timeout
+
+            while self._pending:
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - monotonic()
+                    if remaining <= 0:
+                        return False
+                self._condition.wait(remaining)
+            return True
+
+    def metrics(self):
+        """
+        Return the metrics of the dispatcher.
+
+        :rtype: A dictionary with the number of listener calls ``dispatched``,
+         ``pending``, ``completed``, ``failed`` and that exceeded the timeout
+         (``timeouts``), and the ``total_time`` and ``max_time`` in seconds
+         spent in listener calls.
+        """
+        with self._condition:
+            return {
+                'dispatched': self._dispatched,
+                'pending': self._pending,
+                'completed': self._completed,
+                'failed': self._failed,
+                'timeouts': self._timeouts,
+                'total_time': self._total_time,
+                'max_time': self._max_time,
+            }
+
+    def stop(self):
+        """
+        Deliver pending notifications and stop the worker threads.
+        """
+        with self._condition:
+            if not self._running:
+                return
+            self._running = False
+
+        self.wait()
+        self._lanes_pool.shutdown()
+
+        # Python 2 can't unregister exit handlers
+        if hasattr(atexit, 'unregister'):
+            atexit.unregister(self.stop)
+
+    def _drain(self, lane):
+        """
+        Deliver the notifications queued in the given lane.
+        """
+        while True:
+            with self._condition:
+                queue = self._lanes[lane]
+                if not queue:
+                    del self._lanes[lane]
+                    return
+                listener, args = queue.popleft()
+
+            self._deliver(listener, args)
+
+    def _timed_call(self, listener, args):
+        """
+        Call a listener in a thread of its own, waiting at most the timeout
+        once the call started.
+
+        :rtype: ``True`` if the call finished, ``False`` if it timed out.
+        """
+        started = Event()
+        finished = Event()
+        error = []
+
+        def target():
+            started.set()
+            try:
+                self._call(listener, *args)
+            except Exception as e:
+                error.append(e)
+            finally:
+                finished.set()
+
+        thread = Thread(target=target, name='confspec-listener-call')
+        thread.daemon = True
+        thread.start()
+        started.wait()
+
+        if not finished.wait(self._timeout):
+            return False
+        if error:
+            raise error[0]
+        return True
+
+    def _deliver(self, listener, args):
+        """
+        Call a listener and record the outcome.
+        """
+        start = monotonic()
+        completed = failed = timeouts = 0
+        try:
+            if self._timeout is None:
+                self._call(listener, *args)
+            elif not self._timed_call(listener, args):
+                timeouts = 1
+                log.error(
+                    'Listener {!r} timed out after {} seconds.'.format(
+                        listener, self._timeout
+                    )
+                )
+            completed = 1 - timeouts
+        except Exception:
+            failed = 1
+            log.error(format_exc())
+        elapsed = monotonic() - start
+
+        with self._condition:
+            self._completed += completed
+            self._failed += failed
+            self._timeouts += timeouts
+            self._total_time += elapsed
+            self._max_time = max(self._max_time, elapsed)
+            self._pending -= 1
+            if not self._pending:
+                self._condition.notify_all()
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""
+Module for synchronization primitives.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from threading import Condition, Lock, local
+
+try:
+    from threading import get_ident
+except ImportError:
+    from thread import get_ident
+
+
+__all__ = ['RWLock']
+
+
+class RWLock(object):
+    """
+    Reader-writer lock.
+
+    Any number of threads can hold the lock for reading at the same time,
+    while a single thread can hold it for writing. Waiting writers have
+    preference over new readers, so writers are never starved.
+
+    The lock is reentrant: a thread holding the lock for writing can acquire
+    it again for reading or writing, and a thread holding it for reading can
+    acquire it again for reading. Upgrading a read lock to a write lock is not
+    supported and raises :py:exc:`RuntimeError`.
+
+    Use the :attr:`read` and :attr:`write` context managers:
+
+    >>> from confspec.locking import RWLock
+    >>> lock = RWLock()
+    >>> with lock.read:
+    ...     with lock.read:
+    ...         pass
+    >>> with lock.write:
+    ...     with lock.read:
+    ...         pass
+    """
+
+    def __init__(self):
+        self._condition = Condition(Lock())
+        self._readers = 0
+        self._writer = None
+        self._depth = 0
+        self._waiting_writers = 0
+        self._local = local()
+
+        self.read = _ReadLock(self)
+        """Context manager that holds the lock for reading."""
+
+        self.write = _WriteLock(self)
+        """Context manager that holds the lock for writing."""
+
+    def acquire_read(self):
+        """
+        Acquire the lock for reading, blocking until no thread is writing.
+        """
+        me = get_ident()
+        with self._condition:
+            # Reading while writing
+            if self._writer == me:
+                self._depth += 1
+                return
+
+            # Reentrant reads don't wait for writers, or they would deadlock
+            held = getattr(self._local, 'reads', 0)
+            if not held:
+                while self._writer is not None or self._waiting_writers:
+                    self._condition.wait()
+
+            self._readers += 1
+            self._local.reads = held + 1
+
+    def release_read(self):
+        """
+        Release the lock acquired with :meth:`acquire_read`.
+        """
+        with self._condition:
+            if self._writer == get_ident():
+                self._depth -= 1
+                return
+
+            held = getattr(self._local, 'reads', 0)
+            if not held:
+                raise RuntimeError('Cannot release an unacquired lock.')
+
+            self._local.reads = held - 1
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquire_write(self, blocking=True):
+        """
+        Acquire the lock for writing, blocking until no other thread is
+        reading or writing.
+
+        :param bool blocking: If ``False``, return right away instead of
+         blocking if the lock can't be acquired.
+        :rtype: ``True`` if the lock was acquired.
+        """
+        me = get_ident()
+        with self._condition:
+            if self._writer == me:
+                self._depth += 1
+                return True
+
+            if getattr(self._local, 'reads', 0):
+                raise RuntimeError(
+                    'Cannot upgrade a read lock to a write lock.'
+                )
+
+            if not blocking and (self._writer is not None or self._readers):
+                return False
+
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._condition.wait()
+            finally:
+                self._waiting_writers -= 1
+
+            self._writer = me
+            self._depth = 1
+            return True
+
+    def release_write(self):
+        """
+        Release the lock acquired with :meth:`acquire_write`.
+        """
+        with self._condition:
+            if self._writer != get_ident():
+                raise RuntimeError('Cannot release an unacquired lock.')
+
+            self._depth -= 1
+            if not self._depth:
+                self._writer = None
+                self._condition.notify_all()
+
+    def is_writing(self):
+        """
+        ``True`` if the current thread holds the lock for writing.
+        """
+        return self._writer == get_ident()
+
+
+class _ReadLock(object):
+    """
+    Context manager for the read side of a :class:`RWLock`.
+    """
+
+    __slots__ = ('_lock', )
+
+    def __init__(self, lock):
+        self._lock = lock
+
+    def __enter__(self):
+        self._lock.acquire_read()
+
+    def __exit__(self, *exc_info):
+        self._lock.release_read()
+
+
+class _WriteLock(_ReadLock):
+    """
+    Context manager for the write side of a :class:`RWLock`.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        self._lock.acquire_write()
+
+    def __exit__(self, *exc_info):
+        self._lock.release_write()
@@ -21,17 +21,29 @@ Module for the configuration manager.
 
 from __future__ import absolute_import, division, print_function
 
-import logging as log
-from traceback import format_exc
-from os import makedirs
+from collections import OrderedDict
+
+try:
+    from collections.abc import KeysView
+except ImportError:
+    from collections import KeysView
+from contextlib import contextmanager
+from os import makedirs, stat as os_stat
 from os.path import isfile, exists, expanduser, abspath, dirname
 
-from .providers import providers
+from .options import ConfigOpt
+from .providers import providers, FormatProvider
+from .locking import RWLock
+from .utils import atomic_write, log, format_exc, iscoroutinefunction
+from .utils import FSYNC_POLICIES
 
 
 __all__ = ['ConfigMg']
 
 
+_UNCHANGED = object()
+
+
 class ConfigMg(object):
     """
     Configuration manager object.
@@ -65,7 +77,8 @@ class ConfigMg(object):
      ignored by :meth:`do_import` so importing (and thus altering the state of
      the configuration) doesn't trigger a file write for each key value change.
      This feature can be enabled or disabled at any time using
-     :meth:`enable_writeback`.
+     :meth:`enable_writeback`. Saves can also be performed by a background
+     thread, see :meth:`enable_background_writeback`.
 
     :param bool safe: Enable safe mode. When safe mode is enabled all
      exceptions happening within all methods are written to
@@ -74,17 +87,36 @@ class ConfigMg(object):
      parse error) or when notifying a listener about a option change, among
      others. This feature can be enabled or disabled at any time using
      :meth:`enable_safe`.
+
+    :param str fsync: Durability policy used when writing files. Files are
+     always written to a temporary file that is then renamed, so a crash or a
+     concurrent :meth:`load` never sees a truncated file. See
+     :func:`confspec.utils.atomic_write` for the available policies.
+
+     .. versionadded:: 1.5
+
+    The configuration manager is thread safe. Operations that change the
+    configuration (:meth:`set`, transactions, :meth:`load`, :meth:`do_import`,
+    etc.) are serialized by an internal reader-writer lock, while operations
+    that only read it (:meth:`do_export`, :meth:`save`, etc.) can run
+    concurrently. :meth:`get` and the proxies never lock: use
+    :meth:`snapshot` to read several keys consistently.
     """
 
-    supported_formats = providers.keys()
+    supported_formats = KeysView(providers)
     """
-    Supported format to export configuration held by the configuration manager.
+    Live view of the names of the supported formats, including formats
+    registered after import and formats provided by entry points. See
+    :data:`confspec.providers.providers`.
+
+    .. versionchanged:: 1.5
+       Formats registered later are included.
     """
 
     def __init__(
             self, spec,
             files=tuple(), format='ini', create=True, load=True,
-            notify=False, writeback=True, safe=True, **kwargs):
+            notify=False, writeback=True, safe=True, fsync='file', **kwargs):
 
         # Save kwargs
         self._kwargs = kwargs
@@ -99,20 +131,59 @@ class ConfigMg(object):
 
         # Register file stack
         self._files = [abspath(expanduser(f)) for f in files]
+        self._fingerprints = {}
 
         # Register format
         if format not in ConfigMg.supported_formats:
             raise AttributeError('Unknown format \'{}\''.format(format))
         self._format = format
 
+        # Register fsync policy
+        if fsync not in FSYNC_POLICIES:
+            raise AttributeError('Unknown fsync policy \'{}\''.format(fsync))
+        self._fsync = fsync
+
         # Register flags
         self._create = create
         self._notify = notify
         self._writeback = writeback
         self._safe = safe
 
-        # Create map of listeners
+        # Background writer, if enabled
+        self._writer = None
+
+        # Number of threads that read the file stack, if parallel load is
+        # enabled
+        self._load_workers = None
+
+        # Create map of listeners of each key, the subscriptions it's built
+        # from, and their dispatcher if enabled
         self._listeners = {}
+        self._subscriptions = OrderedDict()
+        self._batch_listeners = ()
+        self._dispatcher = None
+
+        # Changes of the current batch (transaction or import), if any
+        self._batch = None
+        self._transaction = False
+
+        # Configuration generation and its snapshot, created on demand
+        self._generation = 0
+        self._snapshot = None
+
+        # Create lock that serializes changes
+        self._lock = RWLock()
+
+        # Instrumentation, if enabled
+        self._stats = None
+
+        # Shared memory publisher or subscriber, if any
+        self._publisher = None
+        self._subscriber = None
+        self._subscribed = None
+
+        # Event loop that runs coroutine listeners, bound on first use
+        self._loop = None
 
         # Create categories map
         self._categories = {}
@@ -122,8 +193,12 @@ class ConfigMg(object):
             else:
                 self._categories[s.category] = [s]
 
+        # Create cache of rendered fragments used by the format providers
+        self._fragments = {}
+
         # Create proxy
         self._proxy = ConfigProxy(self)
+        self._fast_proxy = None
 
         # Load configuration files
         if load:
@@ -143,101 +218,682 @@ class ConfigMg(object):
         """
         self._writeback = enable
 
+    def enable_background_writeback(self, enable, delay=0.1, interval=1.0):
+        """
+        Enable saving the configuration in a background thread.
+
+        When enabled, the saves triggered by the writeback mechanism are handed
+        to a :class:`confspec.writer.BackgroundWriter` instead of being
+        performed in the thread that changed the configuration. Bursts of
+        changes within ``delay`` seconds result in a single save, and saves
+        never happen more often than once every ``interval`` seconds.
+
+        Use :meth:`flush` to wait for pending saves. Pending saves are also
+        performed when background writeback is disabled and at interpreter
+        exit.
+
+        .. versionadded:: 1.5
+
+        :param bool enable: Enable or disable background writeback.
+        :param float delay: Seconds to wait for more changes before saving.
+        :param float interval: Minimum number of seconds between two saves.
+        """
+        if self._writer is not None:
+            self._writer.stop()
+            self._writer = None
+
+        if enable:
+            # Lazy load the writer
+            from .writer import BackgroundWriter
+
+            self._writer = BackgroundWriter(
+                self.save, delay=delay, interval=interval
+            )
+
+    def flush(self):
+        """
+        Wait until all pending background saves are written.
+        See :meth:`enable_background_writeback`.
+
+        .. versionadded:: 1.5
+        """
+        if self._writer is not None:
+            self._writer.flush()
+
+    def enable_parallel_load(self, enable, workers=4):
+        """
+        Enable reading and parsing the files of the file stack in a pool of
+        threads.
+
+        When enabled, :meth:`load` and :meth:`reload` read and parse all the
+        files concurrently, and then import them one by one in stack order, so
+        the result is the same as importing them sequentially. This hides the
+        latency of slow filesystems (like network mounts) when the stack has
+        several files. Formats whose provider doesn't implement
+        :meth:`confspec.providers.FormatProvider.do_stage` are always loaded
+        sequentially.
+
+        As the constructor loads the files before parallel load can be
+        enabled, create the configuration manager with ``load=False``:
+
+        ::
+
+           confmg = ConfigMg(spec, files=files, load=False)
+           confmg.enable_parallel_load(True)
+           confmg.load()
+
+        .. versionadded:: 1.5
+
+        :param bool enable: Enable or disable parallel load.
+        :param int workers: Maximum number of threads reading files.
+        """
+        self._load_workers = workers if enable else None
+
+    def enable_listener_dispatch(self, enable, workers=4, timeout=None):
+        """
+        Enable calling listeners in a pool of threads.
+
+        When enabled, listeners are handed to a
+        :class:`confspec.dispatch.ListenerDispatcher` instead of being called
+        in the thread that changed the configuration, so slow listeners don't
+        delay :meth:`set`, transactions or imports. The listeners of a key are
+        still called in the order the changes happened. Listener errors are
+        always logged, even if safe mode is disabled.
+
+        Use :meth:`wait_for_listeners` to wait for pending notifications.
+        Pending notifications are also delivered when listener dispatch is
+        disabled and at interpreter exit.
+
+        .. versionadded:: 1.5
+
+        :param bool enable: Enable or disable listener dispatch.
+        :param int workers: Number of worker threads.
+        :param float timeout: Maximum number of seconds to wait for a listener
+         before delivering the next notification of the same key, or ``None``
+         to wait for as long as needed.
+        """
+        if self._dispatcher is not None:
+            self._dispatcher.stop()
+            self._dispatcher = None
+
+        if enable:
+            # Lazy load the dispatcher
+            from .dispatch import ListenerDispatcher
+
+            self._dispatcher = ListenerDispatcher(
+                self._call_listener, workers=workers, timeout=timeout
+            )
+
+    def wait_for_listeners(self, timeout=None):
+        """
+        Wait until all the notifications queued in the listener dispatcher
+        are delivered. See :meth:`enable_listener_dispatch`.
+
+        .. versionadded:: 1.5
+
+        :param float timeout: Maximum number of seconds to wait, or ``None``
+         to wait for as long as needed.
+        :rtype: ``True`` if all notifications were delivered, ``False`` if
+         the timeout expired.
+        """
+        if self._dispatcher is None:
+            return True
+        return self._dispatcher.wait(timeout)
+
+    def listener_metrics(self):
+        """
+        Return the metrics of the listener dispatcher, as described in
+        :meth:`confspec.dispatch.ListenerDispatcher.metrics`, or ``None`` if
+        listener dispatch is not enabled.
+
+        .. versionadded:: 1.5
+        """
+        if self._dispatcher is None:
+            return None
+        return self._dispatcher.metrics()
+
+    def enable_instrumentation(self, enable, per_key=True):
+        """
+        Enable recording counters and latency histograms of each phase of the
+        configuration manager: file reads and writes, imports and exports,
+        parsing and validation of values, and listener calls. See
+        :class:`confspec.stats.Instrumentation`.
+
+        When disabled (the default) the cost of the instrumentation is a
+        single attribute check per phase.
+
+        .. versionadded:: 1.5
+
+        :param bool enable: Enable or disable the instrumentation. Enabling
+         it again resets the counters and histograms.
+        :param bool per_key: Record the phases that apply to a key by key.
+        """
+        self._stats = None
+        if enable:
+            # Lazy load the instrumentation
+            from .stats import Instrumentation
+
+            self._stats = Instrumentation(per_key=per_key)
+
+    def instrumentation(self):
+        """
+        Return the :class:`confspec.stats.Instrumentation` of the
+        configuration manager, or ``None`` if it's not enabled. Use its
+        ``as_dict()`` and ``prometheus()`` methods to read the recorded
+        counters and histograms. See :meth:`enable_instrumentation`.
+
+        .. versionadded:: 1.5
+        """
+        return self._stats
+
     def enable_safe(self, enable):
         """
         Enable safe mode. See :class:`ConfigMg`.
         """
         self._safe = enable
 
-    def register_listener(self, func, key):
+    def register_listener(self, func, key=None, category=None, pattern=None):
         """
-        Register a listener for given key.
+        Register a listener for given key, for all keys of given category or
+        for all keys matching given glob pattern (use ``pattern='*'`` for all
+        keys). Exactly one of ``key``, ``category`` or ``pattern`` must be
+        given.
 
         Listener function should have the following signature:
 
         ::
 
            listener(key, old_value, value)
+
+        A listener subscribed to a key more than once (for example by key and
+        by category) is called only once per change.
+
+        Listeners can also be coroutine functions. Their coroutines are
+        scheduled as tasks of the event loop the configuration manager is bound
+        to, instead of being run inline. The manager is bound to the event loop
+        running when the first coroutine listener is registered or when any of
+        the asyncio methods (:meth:`aload`, :meth:`asave`, :meth:`aset` or
+        :meth:`awatch`) is first used.
+
+        .. versionchanged:: 1.5
+           Listeners can be coroutine functions, and subscribe by category or
+           by pattern.
+
+        :rtype: ``True`` if the listener was registered, ``False`` if the
+         listener is invalid, already registered for the same subscription or
+         the subscription matches no key.
         """
-        if func is None or \
-                not hasattr(func, '__call__') or \
-                key not in self._keys:
+        if func is None or not hasattr(func, '__call__'):
+            return False
+
+        keys = self._subscribed_keys(key, category, pattern)
+        if not keys:
             return False
 
-        if key not in self._listeners:
-            self._listeners[key] = []
+        if iscoroutinefunction(func):
+            # Lazy load asyncio support
+            from .aio import bind
+            bind(self)
+
+        subscription = (func, key, category, pattern)
+        with self._lock.write:
+            if subscription in self._subscriptions:
+                return False
+            self._subscriptions[subscription] = keys
+            self._index_listeners(keys)
+            return True
+
+    def unregister_listener(self, func, key=None, category=None, pattern=None):
+        """
+        Unregister a listener previously registered for the given key,
+        category or pattern.
 
-        listeners = self._listeners[key]
-        if func not in listeners:
-            listeners.append(func)
+        .. versionchanged:: 1.5
+           Accept the ``category`` and ``pattern`` subscriptions.
+        """
+        subscription = (func, key, category, pattern)
+        with self._lock.write:
+            keys = self._subscriptions.pop(subscription, None)
+            if keys is None:
+                return False
+            self._index_listeners(keys)
             return True
-        return False
 
-    def unregister_listener(self, func, key):
+    def register_batch_listener(self, func):
         """
-        Unregister a listener previously registered for the given key.
+        Register a batch listener.
+
+        Batch listeners are notified once per published change of the
+        configuration: once per :meth:`load`, :meth:`reload`,
+        :meth:`do_import` or committed transaction, and once per :meth:`set`
+        made outside of them. Batch listener function should have the
+        following signature:
+
+        ::
+
+           listener(changes, generation)
+
+        Where ``changes`` is an ordered mapping of each changed key to a
+        ``(old_value, value)`` tuple, and ``generation`` is the generation of
+        the configuration the changes were published in (see
+        :attr:`confspec.snapshot.ConfigSnapshot.generation`). Listeners must
+        not modify ``changes``, as it's shared by all of them.
+
+        As regular listeners, batch listeners are only notified if
+        notifications are enabled, and can be coroutine functions.
+
+        .. versionadded:: 1.5
+
+        :rtype: ``True`` if the listener was registered, ``False`` if the
+         listener is invalid or already registered.
         """
-        if key not in self._listeners:
+        if func is None or not hasattr(func, '__call__'):
             return False
 
-        listeners = self._listeners[key]
-        if func in listeners:
-            del listeners[listeners.index(func)]
+        if iscoroutinefunction(func):
+            # Lazy load asyncio support
+            from .aio import bind
+            bind(self)
+
+        with self._lock.write:
+            if func in self._batch_listeners:
+                return False
+            self._batch_listeners += (func, )
+            return True
+
+    def unregister_batch_listener(self, func):
+        """
+        Unregister a batch listener previously registered.
+
+        .. versionadded:: 1.5
+        """
+        with self._lock.write:
+            if func not in self._batch_listeners:
+                return False
+            self._batch_listeners = tuple(
+                listener for listener in self._batch_listeners
+                if listener != func
+            )
             return True
-        return False
+
+    def _subscribed_keys(self, key, category, pattern):
+        """
+        Return the keys selected by a listener subscription, or ``None`` if
+        the subscription is invalid.
+        """
+        if [key, category, pattern].count(None) != 2:
+            return None
+        if key is not None:
+            if key not in self._keys:
+                return None
+            return frozenset([key])
+        if category is not None:
+            if category not in self._categories:
+                return None
+            return frozenset(opt.key for opt in self._categories[category])
+        # Lazy load pattern matching
+        from fnmatch import fnmatchcase
+
+        return frozenset(k for k in self._keys if fnmatchcase(k, pattern))
+
+    def _index_listeners(self, keys):
+        """
+        Rebuild the index of listeners of given keys from the subscriptions,
+        so notifying never matches subscriptions.
+        """
+        # Lists of listeners are replaced, never modified, so they can be
+        # iterated while notifying without holding the lock
+        for key in keys:
+            listeners = []
+            for (func, _, _, _), subscribed in self._subscriptions.items():
+                if key in subscribed and func not in listeners:
+                    listeners.append(func)
+            if listeners:
+                self._listeners[key] = tuple(listeners)
+            else:
+                self._listeners.pop(key, None)
 
     def save(self):
         """
         Export current configuration and write it to the last file in the
-        file stack.
+        file stack. The file is replaced atomically, see
+        :func:`confspec.utils.atomic_write`.
         """
         if len(self._files) > 0:
             try:
-                with open(self._files[-1], 'w') as f:
-                    f.write(self.do_export(format=self._format))
+                self._write_file(
+                    self._files[-1], self.do_export(format=self._format)
+                )
             except Exception as e:
                 if not self._safe:
                     raise e
                 else:
                     log.error(format_exc())
 
+    def asave(self):
+        """
+        asyncio variant of :meth:`save`. The file is written in the default
+        executor of the running event loop.
+
+        .. versionadded:: 1.5
+
+        :rtype: A coroutine.
+        """
+        # Lazy load asyncio support
+        from .aio import asave
+        return asave(self)
+
     def load(self):
         """
         Import all files in the file stack.
+
+        Files are streamed to the format provider, so providers that parse
+        line by line never hold a whole file in memory.
+        """
+        with self._batched():
+            self._load_files(self._files)
+
+    def aload(self):
+        """
+        asyncio variant of :meth:`load`. Files are imported in the default
+        executor of the running event loop, where regular listeners are
+        called too.
+
+        .. versionadded:: 1.5
+
+        :rtype: A coroutine.
+        """
+        # Lazy load asyncio support
+        from .aio import aload
+        return aload(self)
+
+    def watch(self, **kwargs):
         """
-        for fn in self._files:
+        Start watching the files in the file stack, reloading them when they
+        change.
+
+        Keyword arguments are passed to :class:`confspec.watcher.FileWatcher`.
+
+        .. versionadded:: 1.5
+
+        :rtype: The started :class:`confspec.watcher.FileWatcher`. Call its
+         :meth:`confspec.watcher.FileWatcher.stop` method to stop watching.
+        """
+        # Lazy load the watcher
+        from .watcher import FileWatcher
+
+        watcher = FileWatcher(self, **kwargs)
+        watcher.start()
+        return watcher
+
+    def awatch(self, **kwargs):
+        """
+        asyncio variant of :meth:`watch`. Must be called with an event loop
+        running.
+
+        Keyword arguments are passed to :class:`confspec.aio.AsyncFileWatcher`.
+
+        .. versionadded:: 1.5
+
+        :rtype: The started :class:`confspec.aio.AsyncFileWatcher`. Await its
+         :meth:`confspec.aio.AsyncFileWatcher.stop` coroutine to stop
+         watching.
+        """
+        # Lazy load asyncio support
+        from .aio import AsyncFileWatcher, bind
+
+        bind(self)
+
+        watcher = AsyncFileWatcher(self, **kwargs)
+        watcher.start()
+        return watcher
+
+    def _write_file(self, fn, data):
+        """
+        Write a file of the file stack atomically and record its fingerprint,
+        so :meth:`reload` doesn't import it again.
+        """
+        # Lazy load dependencies
+        from hashlib import sha1
+
+        stats = self._stats
+        if stats is None:
+            atomic_write(fn, data, fsync=self._fsync)
+        else:
+            start = stats.clock()
             try:
-                # Ignore non-regular files
-                if exists(fn) and not isfile(fn):
-                    raise Exception(
-                        'Cannot import non-file "{}".'.format(fn)
-                    )
+                atomic_write(fn, data, fsync=self._fsync)
+            except Exception:
+                stats.count('errors', 'write')
+                raise
+            finally:
+                stats.observe('write', fn, stats.clock() - start)
+
+        self._fingerprints[fn] = (
+            _stat(fn), sha1(data.encode('utf-8')).hexdigest()
+        )
+
+    def reload(self):
+        """
+        Import the files in the file stack that changed since they were last
+        imported by :meth:`load` or :meth:`reload`.
 
-                # Create file if requested and file doesn't exists
-                if not exists(fn) and self._create:
-                    directory = dirname(fn)
-                    if not exists(directory):
-                        makedirs(directory)
-                    with open(fn, 'w') as f:
-                        f.write(self.do_export())
-                    continue
+        Files are compared using their stat information (device, inode, size
+        and modification time) and, if it differs, the hash of their content.
+        Once a file is found changed, all the files after it in the stack are
+        imported too, so they keep their precedence.
 
-                # Import file (if exists, if not, fail - raise)
-                with open(fn, 'r') as f:
-                    self.do_import(f.read())
+        Note that, like :meth:`load`, keys removed from a file keep their
+        current value.
 
-            except Exception as e:
-                if not self._safe:
-                    raise e
+        .. versionadded:: 1.5
+
+        :rtype: The list of files that were imported.
+        """
+        reloaded = []
+        with self._batched():
+            for fn in self._files:
+                if not reloaded:
+                    try:
+                        if self._unchanged(fn):
+                            continue
+                    except Exception as e:
+                        if not self._safe:
+                            raise e
+                        else:
+                            log.error(format_exc())
+                        continue
+                reloaded.append(fn)
+
+            loaded = self._load_files(reloaded)
+            if self._stats is not None:
+                for fn in loaded:
+                    self._stats.count('reloads', fn)
+
+        return reloaded
+
+    def _unchanged(self, fn):
+        """
+        Check if a file of the file stack is unchanged since it was last
+        imported or written.
+        """
+        # Files whose last import failed have no hash recorded
+        fingerprint = self._fingerprints.get(fn)
+        if fingerprint is None or (
+                fingerprint[0] is not None and fingerprint[1] is None):
+            return False
+
+        stat = _stat(fn)
+        if stat == fingerprint[0]:
+            return True
+        if stat is not None and isfile(fn) and \
+                _digest(fn) == fingerprint[1]:
+            self._fingerprints[fn] = (stat, fingerprint[1])
+            return True
+        return False
+
+    def _load_files(self, fns):
+        """
+        Import the given files of the file stack in order, reading and parsing
+        them in parallel if enabled. See :meth:`enable_parallel_load`.
+
+        :rtype: The list of files imported without errors.
+        """
+        provider = providers[self._format]
+        workers = self._load_workers
+        if not workers or len(fns) < 2 or not _stages(provider):
+            loaded = []
+            for fn in fns:
+                try:
+                    self._load_file(fn)
+                    loaded.append(fn)
+                except Exception as e:
+                    if not self._safe:
+                        raise e
+                    else:
+                        log.error(format_exc())
+            return loaded
+
+        # Lazy load dependencies
+        from concurrent.futures import ThreadPoolExecutor
+
+        loaded = []
+        with ThreadPoolExecutor(max_workers=min(workers, len(fns))) as pool:
+            futures = [
+                pool.submit(self._stage_file, provider, fn) for fn in fns
+            ]
+
+            # Import the files in stack order as they become available
+            for fn, future in zip(fns, futures):
+                stat, staged, digest, error = future.result()
+                self._fingerprints[fn] = (stat, None)
+                try:
+                    if error is not None:
+                        raise error
+
+                    # Create file if requested and file doesn't exists
+                    if staged is None:
+                        self._create_file(fn)
+                    else:
+                        self._apply_staged(staged)
+                        self._fingerprints[fn] = (stat, digest)
+                    loaded.append(fn)
+
+                except Exception as e:
+                    if not self._safe:
+                        for future in futures:
+                            future.cancel()
+                        raise e
+                    else:
+                        log.error(format_exc())
+        return loaded
+
+    def _stage_file(self, provider, fn):
+        """
+        Read and parse a file of the file stack without importing it, as
+        :meth:`_load_file` does. Runs in the threads of a parallel load.
+
+        :rtype: A tuple ``(stat, staged, digest, error)`` with the stat
+         fingerprint of the file, the values staged by the provider (or
+         ``None`` if the file must be created), the hash of its content and
+         the exception raised, if any.
+        """
+        # Lazy load dependencies
+        from hashlib import sha1
+
+        stat = _stat(fn)
+        try:
+            # Ignore non-regular files
+            if stat is not None and not isfile(fn):
+                raise Exception(
+                    'Cannot import non-file "{}".'.format(fn)
+                )
+
+            if stat is None and self._create:
+                return stat, None, None, None
+
+            digest = sha1()
+            stats = self._stats
+            with open(fn, 'r') as f:
+                lines = _hashed_lines(f, digest)
+
+                if stats is not None:
+                    start = stats.clock()
+                    lines = list(lines)
+                    stats.observe('read', fn, stats.clock() - start)
+
+                    start = stats.clock()
+                    staged = provider.do_stage(self, lines)
+                    stats.observe(
+                        'import', self._format, stats.clock() - start
+                    )
                 else:
-                    log.error(format_exc())
+                    staged = provider.do_stage(self, lines)
+                for line in lines:
+                    pass
+            return stat, staged, digest.hexdigest(), None
+
+        except Exception as e:
+            return stat, None, None, e
+
+    def _load_file(self, fn):
+        """
+        Import a file of the file stack, creating it if requested, and record
+        its fingerprint for :meth:`reload`.
+        """
+        # Lazy load dependencies
+        from hashlib import sha1
+
+        stat = _stat(fn)
+        self._fingerprints[fn] = (stat, None)
+
+        # Ignore non-regular files
+        if stat is not None and not isfile(fn):
+            raise Exception(
+                'Cannot import non-file "{}".'.format(fn)
+            )
+
+        # Create file if requested and file doesn't exists
+        if stat is None and self._create:
+            self._create_file(fn)
+            return
+
+        # Import file (if exists, if not, fail - raise)
+        digest = sha1()
+        stats = self._stats
+        with open(fn, 'r') as f:
+            lines = _hashed_lines(f, digest)
+
+            # Read the file before importing it so both can be timed
+            if stats is not None:
+                start = stats.clock()
+                lines = list(lines)
+                stats.observe('read', fn, stats.clock() - start)
+
+            self.do_import(lines)
+            for line in lines:
+                pass
+        self._fingerprints[fn] = (stat, digest.hexdigest())
+
+    def _create_file(self, fn):
+        """
+        Create a file of the file stack with the current configuration.
+        """
+        directory = dirname(fn)
+        if not exists(directory):
+            makedirs(directory)
+        self._write_file(fn, self.do_export())
 
     def do_import(self, conf, format=None):
         """
         Import and validate a configuration written in a standard format.
 
-        :param str conf: A string with a configuration encoded in the specified
-         format.
+        :param conf: A configuration encoded in the specified format. A
+         string, a text or binary file object or any iterable of lines.
+
+         .. versionchanged:: 1.5
+
+            Added support for file objects and iterables of lines.
         :param format: See :attr:`ConfigMg.supported_formats`.
          If ``None`` (the default) the format specified in the constructor is
          used.
@@ -246,16 +902,82 @@ class ConfigMg(object):
         if format is None:
             format = self._format
 
-        # Disable write back
-        writeback = self._writeback
-        self._writeback = False
+        # Changes made within a batch are not written back
+        with self._batched():
+            stats = self._stats
+            if stats is None:
+                providers[format].do_import(self, conf)
+                return
 
-        # Try to import
+            start = stats.clock()
+            try:
+                providers[format].do_import(self, conf)
+            except Exception:
+                stats.count('errors', 'import')
+                raise
+            finally:
+                stats.observe('import', format, stats.clock() - start)
+
+    def validate(self, conf, format=None):
+        """
+        Check a configuration written in a standard format without importing
+        it.
+
+        Every syntax error and every value that can't be validated is
+        reported, with its line if the format tracks lines (like INI). The
+        configuration manager, its files and its listeners are not touched,
+        and safe mode doesn't apply.
+
+        ::
+
+           report = confmg.validate(document, format='ini')
+           if not report:
+               print(report)
+
+        .. versionadded:: 1.5
+
+        :param conf: A configuration encoded in the specified format. See
+         :meth:`do_import`.
+        :param format: See :attr:`ConfigMg.supported_formats`.
+         If ``None`` (the default) the format specified in the constructor is
+         used.
+        :type format: str or None
+        :rtype: A :class:`confspec.report.ValidationReport`, which is true if
+         the configuration would be imported without errors.
+        :raises AttributeError: If the format is unknown.
+        """
+        # Lazy load validation reports
+        from .report import ValidationReport
+
+        if format is None:
+            format = self._format
+        if format not in ConfigMg.supported_formats:
+            raise AttributeError('Unknown format \'{}\''.format(format))
+
+        # Documents that can't be decoded, or formats that can't be checked,
+        # are reported as a whole
+        report = ValidationReport(format)
         try:
-            providers[format].do_import(self, conf)
-        finally:
-            # Restore writeback setting
-            self._writeback = writeback
+            staged = providers[format].do_stage(self, conf, report)
+        except NotImplementedError:
+            report.error(
+                'Format \'{}\' doesn\'t support validation.'.format(format)
+            )
+            return report
+        except Exception as e:
+            report.error(str(e))
+            return report
+
+        keys = self._keys
+        lines = report.lines
+        for key, value in staged.items():
+            option = keys[key]
+            try:
+                option._validate(option._parse(value))
+            except Exception as e:
+                report.error(str(e), lines.get(key), key)
+
+        return report
 
     def do_export(self, format=None):
         """
@@ -271,46 +993,629 @@ class ConfigMg(object):
         if format is None:
             format = self._format
 
-        return providers[format].do_export(self)
+        with self._lock.read:
+            stats = self._stats
+            if stats is None:
+                return providers[format].do_export(self)
+
+            start = stats.clock()
+            try:
+                return providers[format].do_export(self)
+            finally:
+                stats.observe('export', format, stats.clock() - start)
 
     def get(self, key):
         """
         Get the value of a config key.
+
+        This method never locks, so it can see the changes of an import or a
+        transaction in progress. Use :meth:`snapshot` to read several keys
+        consistently.
         """
         return self._keys[key].value
 
     def set(self, key, value):
         """
         Validate and set a config key.
+
+        If a transaction is in progress (see :meth:`transaction`) the new value
+        is staged: writeback and notification are delayed until the
+        transaction is committed.
         """
-        # Get old value and compare
-        old_value = self.get(key)
-        if value == old_value:
+        applied = self._apply(key, value)
+        if applied is _UNCHANGED:
             return
-
-        # Set and validate new value
-        self._keys[key].value = value
+        old_value, new_value, generation = applied
 
         # Writeback if enabled
         if self._writeback:
-            self.save()
+            self._request_save()
 
         # Notify all listeners of the change
         if self._notify:
-            for listener in self._listeners[key]:
+            self._notify_listeners(key, old_value, value)
+            self._notify_batch([(key, old_value, new_value)], generation)
+
+    def aset(self, key, value):
+        """
+        asyncio variant of :meth:`set`. The configuration is written back in
+        the default executor of the running event loop.
+
+        .. versionadded:: 1.5
+
+        :rtype: A coroutine.
+        """
+        # Lazy load asyncio support
+        from .aio import aset
+        return aset(self, key, value)
+
+    def _apply(self, key, value):
+        """
+        Validate and set a config key, under the lock.
+
+        Return ``(old_value, value, generation)`` if the change still needs to
+        be written back and notified, ``_UNCHANGED`` otherwise.
+        """
+        with self._lock.write:
+            self._check_writable()
+
+            # Get old value and compare
+            old_value = self.get(key)
+            if value == old_value:
+                return _UNCHANGED
+
+            # Set and validate new value
+            option = self._keys[key]
+            internal = option._value
+            stats = self._stats
+            if stats is None:
+                option.value = value
+            else:
+                self._instrumented_set(stats, option, value)
+
+            # Publish the change, or record it in the batch in progress,
+            # along with the last value given for the key. Changes within a
+            # batch are never written back, and only those of imports are
+            # notified right away.
+            batch = self._batch
+            if batch is not None:
+                entry = batch.get(key)
+                if entry is None:
+                    batch[key] = (internal, old_value, value)
+                else:
+                    batch[key] = (entry[0], entry[1], value)
+                if not self._transaction and self._notify:
+                    self._notify_listeners(key, old_value, value)
+                return _UNCHANGED
+
+            new_value = option.value
+            generation = self._publish([(key, old_value, new_value)])
+            return old_value, new_value, generation
+
+    def _apply_staged(self, staged):
+        """
+        Validate the given values and then apply them all at once, as a batch.
+
+        If a value can't be validated nothing is applied and the exception is
+        raised, unless in safe mode, where the error is logged and the key is
+        skipped.
+
+        :param staged: Mapping of keys to values, as staged by
+         :meth:`confspec.providers.FormatProvider.do_stage`.
+        """
+        with self._batched():
+            self._check_writable()
+
+            # Validate all values before applying any
+            keys = self._keys
+            stats = self._stats
+            changes = []
+            for key, value in staged.items():
+                option = keys[key]
+                internal = option._value
+                old_value = option.value
+                if value == old_value:
+                    continue
+
                 try:
-                    listener(key, old_value, value)
+                    if stats is None:
+                        parsed = option._parse(value)
+                        option._validate(parsed)
+                    else:
+                        parsed = self._instrumented_parse(stats, option, value)
                 except Exception as e:
                     if not self._safe:
                         raise e
-                    else:
-                        log.error(format_exc())
+                    log.error(format_exc())
+                    continue
+
+                if parsed != internal:
+                    changes.append(
+                        (key, option, internal, old_value, parsed, value)
+                    )
+
+            # Apply them as part of the batch. Changes of imports are notified
+            # right away, those of a transaction when it's committed.
+            batch = self._batch
+            for key, option, internal, old_value, parsed, value in changes:
+                entry = batch.get(key)
+                if entry is None:
+                    batch[key] = (internal, old_value, value)
+                else:
+                    batch[key] = (entry[0], entry[1], value)
+                option._value = parsed
+                option._revision += 1
+                if stats is not None:
+                    stats.count('changes', key if stats.per_key else None)
+
+            if self._notify and not self._transaction:
+                for key, option, internal, old_value, parsed, value in \
+                        changes:
+                    self._notify_listeners(key, old_value, value)
+
+    def _check_writable(self):
+        """
+        Raise :py:exc:`RuntimeError` if the configuration is read-only, see
+        :meth:`subscribe`.
+        """
+        if self._subscriber is not None:
+            raise RuntimeError(
+                'Configuration is subscribed to \'{}\' and is '
+                'read-only.'.format(self._subscriber.name)
+            )
+
+    def publish(self, name=None, size=None):
+        """
+        Publish the configuration in a shared memory segment, so other
+        processes can :meth:`subscribe` to it instead of loading and parsing
+        the configuration files themselves.
+
+        The configuration is published right away and then every time it
+        changes.
+
+        .. versionadded:: 1.5
+
+        :param str name: Name of the shared memory segment, or ``None`` for a
+         random name.
+        :param int size: Size reserved for the configuration, see
+         :class:`confspec.shm.SharedPublisher`.
+        :rtype: The :class:`confspec.shm.SharedPublisher`. Pass its ``name``
+         to the subscribers, and call its ``close()`` method to stop
+         publishing.
+        """
+        # Lazy load shared memory support
+        from .shm import SharedPublisher
+
+        with self._lock.write:
+            if self._publisher is not None:
+                self._publisher.close()
+            self._publisher = SharedPublisher(self, name=name, size=size)
+            return self._publisher
+
+    def subscribe(self, name):
+        """
+        Attach to a configuration published by another process with
+        :meth:`publish`, and import it.
+
+        The values are copied as the publisher validated them, without
+        parsing. The configuration manager must be created with the same
+        specification as the publisher, and becomes read-only: :meth:`set`
+        raises :py:exc:`RuntimeError`. Call :meth:`sync` to import the
+        changes of the publisher.
+
+        .. versionadded:: 1.5
+
+        :param str name: Name of the shared memory segment.
+        :rtype: The :class:`confspec.shm.SharedSubscriber`.
+        """
+        # Lazy load shared memory support
+        from .shm import SharedSubscriber
+
+        subscriber = SharedSubscriber(name)
+        with self._lock.write:
+            self._subscriber = subscriber
+            self._subscribed = None
+        self.sync()
+        return subscriber
+
+    def sync(self):
+        """
+        Import the configuration published in shared memory if it changed
+        since the last sync. Checking for changes only reads the generation
+        of the publisher, so it's cheap enough to call often (for example, on
+        every request a worker process handles). See :meth:`subscribe`.
+
+        Listeners are notified as in :meth:`do_import`. If the publisher
+        doesn't finish writing the segment in time (for example, because it
+        died while writing) the current configuration is kept, and the error
+        is raised unless in safe mode. See
+        :meth:`confspec.shm.SharedSubscriber.read`.
+
+        .. versionadded:: 1.5
+
+        :rtype: ``True`` if the configuration was imported.
+        """
+        subscriber = self._subscriber
+        if subscriber is None or subscriber.generation == self._subscribed:
+            return False
+
+        with self._batched():
+            try:
+                generation, values = subscriber.read()
+            except Exception as e:
+                if not self._safe:
+                    raise e
+                log.error(format_exc())
+                return False
+
+            batch = self._batch
+            for key, internal in values.items():
+                option = self._keys.get(key)
+                if option is None or option._value == internal:
+                    continue
+
+                old_value = option.value
+                entry = batch.get(key)
+                option_internal = option._value
+                option._value = internal
+                option._revision += 1
+                value = option.value
+                if entry is None:
+                    batch[key] = (option_internal, old_value, value)
+                else:
+                    batch[key] = (entry[0], entry[1], value)
+
+                if self._notify:
+                    self._notify_listeners(key, old_value, value)
+
+            self._subscribed = generation
+        return True
+
+    def _instrumented_set(self, stats, option, value):
+        """
+        Validate and set the value of an option, as its ``value`` setter,
+        timing parsing and validation.
+        """
+        option._value = self._instrumented_parse(stats, option, value)
+        option._revision += 1
+        stats.count('changes', option.key if stats.per_key else None)
+
+    def _instrumented_parse(self, stats, option, value):
+        """
+        Parse and validate a value for an option, timing both steps.
+
+        :rtype: The internal representation of the value.
+        """
+        label = option.key if stats.per_key else None
+
+        start = stats.clock()
+        try:
+            parsed = option._parse(value)
+        except Exception:
+            stats.count('errors', 'parse')
+            raise
+        finally:
+            parsed_at = stats.clock()
+            stats.observe('parse', label, parsed_at - start)
+
+        try:
+            option._validate(parsed)
+        except Exception:
+            stats.count('errors', 'validate')
+            raise
+        finally:
+            stats.observe('validate', label, stats.clock() - parsed_at)
+
+        return parsed
+
+    def snapshot(self):
+        """
+        Return an immutable snapshot of the configuration.
+
+        The first call creates the snapshot. From then on, a new snapshot is
+        swapped in after each change, committed transaction and import, so the
+        returned snapshot is always consistent: it never holds values of a
+        transaction or an import in progress. Readers can keep a reference to
+        a snapshot and use it without any locking.
+
+        .. versionadded:: 1.5
+
+        :rtype: A :class:`confspec.snapshot.ConfigSnapshot`.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+
+        with self._lock.read:
+            snapshot = self._snapshot
+            if snapshot is None:
+                values = {key: opt.value for key, opt in self._keys.items()}
+                if self._batch:
+                    for key, entry in self._batch.items():
+                        values[key] = entry[1]
+                # Lazy load snapshots
+                from .snapshot import ConfigSnapshot
+
+                snapshot = ConfigSnapshot(values, self._generation)
+                self._snapshot = snapshot
+            return snapshot
+
+    def _publish(self, changed):
+        """
+        Start a new generation of the configuration with the given changes,
+        swapping in a new snapshot if snapshots are in use.
+
+        :param list changed: List of ``(key, old_value, value)``.
+        :rtype: The current generation.
+        """
+        if not changed:
+            return self._generation
+
+        self._generation += 1
+        if self._snapshot is not None:
+            self._snapshot = self._snapshot.evolve(
+                {key: value for key, old_value, value in changed},
+                self._generation
+            )
+
+        if self._publisher is not None:
+            try:
+                self._publisher.publish()
+            except Exception as e:
+                if not self._safe:
+                    raise e
+                else:
+                    log.error(format_exc())
+
+        return self._generation
+
+    @contextmanager
+    def _batched(self):
+        """
+        Group the changes made within the block in a batch, published once at
+        the end of the block, holding the lock for writing. Nested blocks join
+        the batch in progress.
+
+        Batch listeners are notified once the lock is released.
+        """
+        changed = None
+        try:
+            with self._lock.write:
+                if self._batch is not None:
+                    yield
+                    return
+
+                self._batch = OrderedDict()
+                try:
+                    yield
+                finally:
+                    changed, generation = self._end_batch()
+        finally:
+            if changed and self._notify:
+                self._notify_batch(changed, generation)
+
+    def _end_batch(self):
+        """
+        Close the batch in progress and publish its changes.
+
+        :rtype: List of ``(key, old_value, value)`` of the changed keys and
+         the generation they were published in.
+        """
+        batch = self._batch
+        self._batch = None
+
+        changed = []
+        for key, (internal, old_value, given) in batch.items():
+            value = self._keys[key].value
+            if value != old_value:
+                changed.append((key, old_value, value))
+
+        return changed, self._publish(changed)
+
+    def _request_save(self):
+        """
+        Save the configuration, or schedule a save if background writeback is
+        enabled.
+        """
+        if self._writer is not None:
+            self._writer.request()
+        else:
+            self.save()
+
+    def _notify_listeners(self, key, old_value, value):
+        """
+        Call all listeners registered for the given key, or hand them to the
+        listener dispatcher if enabled.
+        """
+        listeners = self._listeners.get(key, ())
+        if listeners:
+            self._call_listeners(key, listeners, (key, old_value, value))
+
+    def _notify_batch(self, changed, generation):
+        """
+        Call all batch listeners with the given changes.
+
+        :param list changed: List of ``(key, old_value, value)``.
+        :param int generation: Generation the changes were published in.
+        """
+        listeners = self._batch_listeners
+        if listeners:
+            changes = OrderedDict(
+                (key, (old_value, value)) for key, old_value, value in changed
+            )
+            self._call_listeners(None, listeners, (changes, generation))
+
+    def _call_listeners(self, lane, listeners, args):
+        """
+        Call given listeners with given arguments, or hand them to the
+        listener dispatcher, in the given lane, if enabled.
+        """
+        dispatcher = self._dispatcher
+        if dispatcher is not None:
+            try:
+                dispatcher.dispatch(lane, listeners, args)
+                return
+            except RuntimeError:
+                # The dispatcher was stopped while disabling listener dispatch
+                # or at exit, call the listeners here instead
+                pass
+
+        for listener in listeners:
+            try:
+                self._call_listener(listener, *args)
+            except Exception as e:
+                if not self._safe:
+                    raise e
+                else:
+                    log.error(format_exc())
+
+    def _call_listener(self, listener, *args):
+        """
+        Call a listener, scheduling the coroutine it returns, if any.
+        """
+        stats = self._stats
+        if stats is None:
+            result = listener(*args)
+        else:
+            # Regular listeners get (key, old_value, value)
+            if len(args) == 3:
+                phase = 'listener'
+                label = args[0] if stats.per_key else None
+            else:
+                phase, label = 'batch_listener', None
 
-    def get_proxy(self):
+            start = stats.clock()
+            try:
+                result = listener(*args)
+            except Exception:
+                stats.count('errors', phase)
+                raise
+            finally:
+                stats.observe(phase, label, stats.clock() - start)
+
+        if result is not None and hasattr(result, '__await__'):
+            # Lazy load asyncio support
+            from .aio import schedule
+            schedule(self, result)
+
+    def begin(self):
+        """
+        Start a transaction.
+
+        While a transaction is in progress values set with :meth:`set` are
+        validated and applied, but the configuration is not written back and
+        listeners are not notified until :meth:`commit` is called. Call
+        :meth:`rollback` to restore the values the configuration had when the
+        transaction started.
+
+        .. versionadded:: 1.5
+        """
+        self._lock.acquire_write()
+        if self._batch is not None:
+            self._lock.release_write()
+            raise RuntimeError(
+                'A transaction or an import is already in progress.'
+            )
+        self._batch = OrderedDict()
+        self._transaction = True
+
+    def commit(self):
+        """
+        Commit the transaction in progress.
+
+        The configuration is written back once (if writeback is enabled) and
+        listeners are notified once per changed key, with the value the key had
+        before the transaction started as the old value and the last value
+        given to :meth:`set` as the value, as :meth:`set` does.
+
+        .. versionadded:: 1.5
+        """
+        if not self._transaction or not self._lock.is_writing():
+            raise RuntimeError('No transaction in progress.')
+        self._transaction = False
+
+        try:
+            given = {key: entry[2] for key, entry in self._batch.items()}
+            changed, generation = self._end_batch()
+        finally:
+            self._lock.release_write()
+
+        if not changed:
+            return
+
+        # Writeback if enabled
+        if self._writeback:
+            self._request_save()
+
+        # Notify all listeners of the changes
+        if self._notify:
+            for key, old_value, value in changed:
+                self._notify_listeners(key, old_value, given[key])
+            self._notify_batch(changed, generation)
+
+    def rollback(self):
+        """
+        Discard the transaction in progress, restoring the values the
+        configuration had when the transaction started.
+
+        .. versionadded:: 1.5
+        """
+        if not self._transaction or not self._lock.is_writing():
+            raise RuntimeError('No transaction in progress.')
+        self._transaction = False
+
+        batch = self._batch
+        self._batch = None
+        for key, (internal, old_value, value) in batch.items():
+            option = self._keys[key]
+            option._value = internal
+            option._revision += 1
+        self._lock.release_write()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Context manager that wraps a block of code in a transaction.
+
+        The transaction is committed if the block finishes normally and rolled
+        back if an exception is raised within it:
+
+        ::
+
+           with confmg.transaction():
+               confmg.set('host', 'example.com')
+               confmg.set('port', 8080)
+
+        See :meth:`begin`.
+
+        .. versionadded:: 1.5
+        """
+        self.begin()
+        try:
+            yield self
+        except BaseException:
+            self.rollback()
+            raise
+        self.commit()
+
+    def get_proxy(self, fast=False):
         """
         Return a proxy object for current configuration specification.
+
+        :param bool fast: If ``True``, return an instance of a class generated
+         from the specification, with one attribute per key that reads the
+         value of the option directly. Reads are faster than with the default
+         proxy, writes still go through :meth:`set`. Reading an unknown key
+         raises :py:exc:`AttributeError`.
+
+         .. versionadded:: 1.5
         """
-        return self._proxy
+        if not fast:
+            return self._proxy
+
+        if self._fast_proxy is None:
+            self._fast_proxy = _make_fast_proxy(self)
+        return self._fast_proxy
 
     def __repr__(self):
         """
@@ -335,6 +1640,61 @@ class ConfigMg(object):
         return repr(self)
 
 
+def _stat(fn):
+    """
+    Return the stat fingerprint of a file, or ``None`` if it doesn't exist.
+    """
+    try:
+        st = os_stat(fn)
+    except OSError:
+        return None
+    return (
+        st.st_dev, st.st_ino, st.st_size,
+        getattr(st, 'st_mtime_ns', st.st_mtime)
+    )
+
+
+def _stages(provider):
+    """
+    Check if a format provider imports by staging, see
+    :meth:`confspec.providers.FormatProvider.do_stage`.
+    """
+    cls = provider if isinstance(provider, type) else type(provider)
+
+    def defined_by(name):
+        return next(
+            (klass for klass in cls.__mro__ if name in klass.__dict__), None
+        )
+
+    return (
+        defined_by('do_import') is FormatProvider and
+        defined_by('do_stage') not in (None, FormatProvider)
+    )
+
+
+def _hashed_lines(lines, digest):
+    """
+    Iterate the given text lines feeding them to the given hash object.
+    """
+    for line in lines:
+        digest.update(line.encode('utf-8'))
+        yield line
+
+
+def _digest(fn):
+    """
+    Return the hash of the content of a text file.
+    """
+    # Lazy load dependencies
+    from hashlib import sha1
+
+    digest = sha1()
+    with open(fn, 'r') as f:
+        for line in _hashed_lines(f, digest):
+            pass
+    return digest.hexdigest()
+
+
 class ConfigProxy(object):
     """
     Proxy object for application configuration.
@@ -357,3 +1717,77 @@ class ConfigProxy(object):
 
     def __str__(self):
         return repr(self)
+
+
+class FastConfigProxy(object):
+    """
+    Base class of the proxy classes generated by
+    :meth:`ConfigMg.get_proxy` for a specification.
+    """
+
+    __slots__ = ()
+
+    # Name mangled so it cannot collide with configuration keys
+    __cfmg = None
+
+    def __delattr__(self, name):
+        raise TypeError('Cannot delete configuration keys.')
+
+    def __repr__(self):
+        return repr(self.__cfmg)
+
+    def __str__(self):
+        return repr(self)
+
+
+class _ValueDescriptor(object):
+    """
+    Descriptor that reads the internal value of an option directly and sets
+    it through the configuration manager.
+    """
+
+    __slots__ = ('_option', '_cfmg')
+
+    def __init__(self, option, cfmg):
+        self._option = option
+        self._cfmg = cfmg
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return self._option._value
+
+    def __set__(self, instance, value):
+        self._cfmg.set(self._option._key, value)
+
+    def __delete__(self, instance):
+        raise TypeError('Cannot delete configuration keys.')
+
+
+class _PropertyDescriptor(_ValueDescriptor):
+    """
+    Descriptor for options that override :attr:`ConfigOpt.value`.
+    """
+
+    __slots__ = ()
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return self._option.value
+
+
+def _make_fast_proxy(cfmg):
+    """
+    Generate a proxy class for the specification of given configuration
+    manager and return an instance of it.
+    """
+    namespace = {'__slots__': (), '_FastConfigProxy__cfmg': cfmg}
+    for key, option in cfmg._keys.items():
+        if type(option).value.fget is ConfigOpt.value.fget:
+            namespace[key] = _ValueDescriptor(option, cfmg)
+        else:
+            namespace[key] = _PropertyDescriptor(option, cfmg)
+
+    cls = type('FastConfigProxy', (FastConfigProxy, ), namespace)
+    return cls()
@@ -21,15 +21,18 @@ Module for configuration options.
 
 from __future__ import absolute_import, division, print_function
 
-import re
-import ast
 import keyword
-import logging as log
 from datetime import datetime, date, time
 from os.path import exists, isfile, isdir, abspath
-from inspect import isclass
 
-from .utils import first_line
+from .utils import first_line, log
+
+
+# Characters allowed in keys
+_KEY_START = frozenset(
+    '_ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+)
+_KEY_CHARS = _KEY_START | frozenset('0123456789')
 
 
 class ConfigOpt(object):
@@ -50,6 +53,45 @@ class ConfigOpt(object):
     :param str category: The category of the configuration option.
     """
 
+    __slots__ = (
+        '_key', '_value', '_revision', 'category', 'comment',
+        '_validator', '_validators', '_kwargs',
+    )
+
+    _internal_type = None
+    """
+    Type of the internal representation of the option. Values of exactly this
+    type are assigned without calling :meth:`parse`. Subclasses must set it
+    only if :meth:`parse` returns such values unchanged.
+
+    Subclasses that override :meth:`parse` without setting it again always
+    parse, see :meth:`__init_subclass__`.
+    """
+
+    _fast_type = None
+    """
+    Type of the values that are assigned without calling :meth:`parse`: the
+    ``_internal_type`` if :meth:`parse` is the one of the class that set it,
+    ``None`` otherwise.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Enable the fast path of the ``value`` setter only if :meth:`parse` is
+        the one of the class that set the ``_internal_type``, so subclasses
+        that override :meth:`parse` can still reject values of that type.
+        """
+        super(ConfigOpt, cls).__init_subclass__(**kwargs)
+
+        declarer = next(
+            klass for klass in cls.__mro__
+            if '_internal_type' in klass.__dict__
+        )
+        if cls.parse is declarer.parse:
+            cls._fast_type = cls._internal_type
+        else:
+            cls._fast_type = None
+
     def __init__(
             self, key=None, default=None, validator=None,
             category='general', comment='', **kwargs):
@@ -57,6 +99,7 @@ class ConfigOpt(object):
         # Private attributes
         self._key = None
         self._value = None
+        self._revision = 0
         self.category = self._valid_key(category)
         self.comment = comment.strip()
 
@@ -65,8 +108,8 @@ class ConfigOpt(object):
         self.key = key
         self.value = default
 
-        # Save kwargs
-        self._kwargs = kwargs
+        # Save kwargs (if any, most options don't have extra kwargs)
+        self._kwargs = kwargs or None
 
         super(ConfigOpt, self).__init__()
 
@@ -79,7 +122,8 @@ class ConfigOpt(object):
         new_key = new_key.strip()
         if not new_key:
             raise ValueError('String must not be empty.')
-        if not re.match('[_A-Za-z][_a-zA-Z0-9]*$', new_key) or \
+        if new_key[0] not in _KEY_START or \
+                not _KEY_CHARS.issuperset(new_key) or \
                 keyword.iskeyword(new_key):
             raise ValueError('Invalid key name.')
         return new_key
@@ -107,25 +151,75 @@ class ConfigOpt(object):
 
     @value.setter
     def value(self, raw):
-        parsed = self.parse(raw)
-        if self.validator is not None:
-
-            # Asume list of callables
-            validators = self.validator
-            # Check if callable (pre 1.4)
-            if hasattr(self.validator, '__call__'):
-                validators = [self.validator]
-
-            for validator in validators:
-                if not validator(parsed):
-                    raise ValueError(
-                        '[{}] cannot accept <{}>. '
-                        'Could not be validated.'.format(
-                            self._key, parsed
-                        )
+        # Inlined _parse() and _validate(), as this is a hot path.
+        # Values already in the internal representation need no parsing
+        if type(raw) is self._fast_type:
+            parsed = raw
+        else:
+            parsed = self.parse(raw)
+
+        for validator in self._validators:
+            if not validator(parsed):
+                raise ValueError(
+                    '[{}] cannot accept <{}>. '
+                    'Could not be validated.'.format(
+                        self._key, parsed
                     )
+                )
 
         self._value = parsed
+        self._revision += 1
+
+    def _parse(self, raw):
+        """
+        Parsing step of the ``value`` setter.
+
+        :rtype: The internal representation of the given value.
+        """
+        if type(raw) is self._fast_type:
+            return raw
+        return self.parse(raw)
+
+    def _validate(self, parsed):
+        """
+        Validation step of the ``value`` setter.
+
+        :raises ValueError: If the given internal representation is not
+         accepted by any of the validators.
+        """
+        for validator in self._validators:
+            if not validator(parsed):
+                raise ValueError(
+                    '[{}] cannot accept <{}>. '
+                    'Could not be validated.'.format(
+                        self._key, parsed
+                    )
+                )
+
+    @property
+    def validator(self):
+        """
+        Validator function or list of validator functions of this
+        configuration option.
+
+        The validators are normalized to a tuple when assigned, so changes to
+        a list of validators after assigning it have no effect.
+        """
+        return self._validator
+
+    @validator.setter
+    def validator(self, validator):
+        if validator is None:
+            validators = ()
+        # Check if callable (pre 1.4)
+        elif hasattr(validator, '__call__'):
+            validators = (validator, )
+        # Asume list of callables
+        else:
+            validators = tuple(validator)
+
+        self._validator = validator
+        self._validators = validators
 
     def parse(self, value):
         """
@@ -186,6 +280,8 @@ class ConfigString(ConfigOpt):
     :type cleaner: function or None
     """
 
+    __slots__ = ('_cleaner', )
+
     def __init__(self, cleaner=None, **kwargs):
         self._cleaner = cleaner
         super(ConfigString, self).__init__(**kwargs)
@@ -194,7 +290,10 @@ class ConfigString(ConfigOpt):
         """
         Override of :meth:`ConfigOpt.parse` that interprets value to string.
         """
-        value = ast.literal_eval(value)
+        # Lazy load dependencies
+        from ast import literal_eval
+
+        value = literal_eval(value)
 
         if self._cleaner is not None:
             return self._cleaner(str(value))
@@ -223,6 +322,8 @@ class ConfigText(ConfigOpt):
     :type cleaner: function or None
     """
 
+    __slots__ = ('_cleaner', )
+
     def __init__(self, cleaner=None, **kwargs):
         self._cleaner = cleaner
         super(ConfigText, self).__init__(**kwargs)
@@ -257,6 +358,8 @@ class ConfigLine(ConfigText):
     :type cleaner: function or None
     """
 
+    __slots__ = ()
+
     def __init__(self, cleaner=first_line, **kwargs):
         super(ConfigLine, self).__init__(cleaner=cleaner, **kwargs)
 
@@ -278,6 +381,10 @@ class ConfigInt(ConfigOpt):
      internal integer.
     """
 
+    __slots__ = ('_base', '_sformat')
+
+    _internal_type = int
+
     def __init__(self, base=0, sformat=None, **kwargs):
         self._base = base
         self._sformat = sformat
@@ -319,6 +426,8 @@ class ConfigDecimal(ConfigInt):
        :parts: 1
     """
 
+    __slots__ = ()
+
     def __init__(self, base=10, **kwargs):
         kwargs['base'] = base
         super(ConfigDecimal, self).__init__(**kwargs)
@@ -336,6 +445,8 @@ class ConfigOctal(ConfigInt):
        :parts: 1
     """
 
+    __slots__ = ()
+
     def __init__(self, base=8, sformat='0{:o}', **kwargs):
         kwargs['base'] = base
         kwargs['sformat'] = sformat
@@ -354,6 +465,8 @@ class ConfigHexadecimal(ConfigInt):
        :parts: 1
     """
 
+    __slots__ = ()
+
     def __init__(self, base=16, sformat='0x{:x}', **kwargs):
         kwargs['base'] = base
         kwargs['sformat'] = sformat
@@ -370,6 +483,10 @@ class ConfigBoolean(ConfigOpt):
        :parts: 1
     """
 
+    __slots__ = ()
+
+    _internal_type = bool
+
     def __init__(self, **kwargs):
         super(ConfigBoolean, self).__init__(**kwargs)
 
@@ -416,6 +533,8 @@ class ConfigFloat(ConfigOpt):
      internal float.
     """
 
+    __slots__ = ('_sformat', )
+
     def __init__(self, sformat=None, **kwargs):
         self._sformat = sformat
         super(ConfigFloat, self).__init__(**kwargs)
@@ -463,6 +582,10 @@ class ConfigDateTime(ConfigOpt):
      :py:meth:`datetime.datetime.strptime` to parse given time strings.
     """
 
+    __slots__ = ('_tformat', )
+
+    _internal_type = datetime
+
     def __init__(self, tformat='%Y-%m-%dT%H:%M:%S', **kwargs):
         self._tformat = tformat
         super(ConfigDateTime, self).__init__(**kwargs)
@@ -500,6 +623,10 @@ class ConfigDate(ConfigDateTime):
      :py:meth:`datetime.datetime.strptime` to parse given time strings.
     """
 
+    __slots__ = ()
+
+    _internal_type = date
+
     def __init__(self, tformat='%Y-%m-%d', **kwargs):
         super(ConfigDate, self).__init__(tformat=tformat, **kwargs)
 
@@ -530,6 +657,10 @@ class ConfigTime(ConfigDateTime):
      :py:meth:`datetime.datetime.strptime` to parse given time strings.
     """
 
+    __slots__ = ()
+
+    _internal_type = time
+
     def __init__(self, tformat='%H:%M:%S', **kwargs):
         super(ConfigTime, self).__init__(tformat=tformat, **kwargs)
 
@@ -564,6 +695,8 @@ class ConfigMap(ConfigOpt):
     :param dict table: Mapping dictionary to lookup keys.
     """
 
+    __slots__ = ('_table', )
+
     def __init__(self, table, **kwargs):
         self._table = table
         super(ConfigMap, self).__init__(**kwargs)
@@ -620,11 +753,13 @@ class ConfigClass(ConfigMap):
     :param list classes: List of Python classes.
     """
 
+    __slots__ = ()
+
     def __init__(self, classes, **kwargs):
         table = {}
         for c in classes:
             table[c.__name__] = c
-        super(ConfigClass, self).__init__(self, table=table, **kwargs)
+        super(ConfigClass, self).__init__(table=table, **kwargs)
 
 
 # -----------------------------------------------------------------------------
@@ -648,6 +783,8 @@ class ConfigPath(ConfigOpt):
      parser. By default :py:func:`os.path.exists` is used.
     """
 
+    __slots__ = ('_checker', )
+
     def __init__(self, checker=exists, **kwargs):
         self._checker = checker
         super(ConfigPath, self).__init__(**kwargs)
@@ -688,6 +825,8 @@ class ConfigFile(ConfigPath):
      parser. By default :py:func:`os.path.isfile` is used.
     """
 
+    __slots__ = ()
+
     def __init__(self, checker=isfile, **kwargs):
         super(ConfigFile, self).__init__(checker=checker, **kwargs)
 
@@ -709,6 +848,8 @@ class ConfigDir(ConfigPath):
      parser. By default :py:func:`os.path.isdir` is used.
     """
 
+    __slots__ = ()
+
     def __init__(self, checker=isdir, **kwargs):
         super(ConfigDir, self).__init__(checker=checker, **kwargs)
 
@@ -727,6 +868,8 @@ class ConfigColor(ConfigOpt):
        :parts: 1
     """
 
+    __slots__ = ()
+
     def parse(self, value):
         """
         Override of :meth:`ConfigOpt.parse` that converts CSS-like color
@@ -769,6 +912,8 @@ class ConfigFont(ConfigOpt):
        :parts: 1
     """
 
+    __slots__ = ()
+
     fonts = []
     """
     List of system font names.
@@ -837,6 +982,15 @@ class ConfigList(ConfigOpt):
        class ConfigListMine(ConfigList, ConfigMine):
             pass
 
+    All options in ``confspec`` use ``__slots__`` to keep instances small.
+    Lists declare the slots of this mix-in in the concrete class, as
+    ``ConfigMine`` can declare slots of its own:
+
+    .. code:: python
+
+       class ConfigListMine(ConfigList, ConfigMine):
+            __slots__ = ('_strict', '_provider')
+
     .. inheritance-diagram:: ConfigList
        :parts: 1
 
@@ -845,6 +999,11 @@ class ConfigList(ConfigOpt):
      ignored.
     """
 
+    __slots__ = ()
+
+    # Elements of lists must always be parsed
+    _internal_type = None
+
     def __init__(self, strict=True, **kwargs):
 
         self._strict = strict
@@ -929,7 +1088,8 @@ class ConfigListString(ConfigList, ConfigString):
     .. inheritance-diagram:: ConfigListString
        :parts: 1
     """
-    pass
+
+    __slots__ = ('_strict', '_provider')
 
 
 class ConfigListText(ConfigList, ConfigText):
@@ -939,7 +1099,8 @@ class ConfigListText(ConfigList, ConfigText):
     .. inheritance-diagram:: ConfigListText
        :parts: 1
     """
-    pass
+
+    __slots__ = ('_strict', '_provider')
 
 
 class ConfigListLine(ConfigList, ConfigLine):
@@ -949,7 +1110,8 @@ class ConfigListLine(ConfigList, ConfigLine):
     .. inheritance-diagram:: ConfigListLine
        :parts: 1
     """
-    pass
+
+    __slots__ = ('_strict', '_provider')
 
 
 class ConfigListInt(ConfigList, ConfigInt):
@@ -959,7 +1121,8 @@ class ConfigListInt(ConfigList, ConfigInt):
     .. inheritance-diagram:: ConfigListInt
        :parts: 1
     """
-    pass
+
+    __slots__ = ('_strict', '_provider')
 
 
 class ConfigListDecimal(ConfigList, ConfigDecimal):
@@ -969,7 +1132,8 @@ class ConfigListDecimal(ConfigList, ConfigDecimal):
     .. inheritance-diagram:: ConfigListDecimal
        :parts: 1
     """
-    pass
+
+    __slots__ = ('_strict', '_provider')
 
 
 class ConfigListOctal(ConfigList, ConfigOctal):
@@ -979,7 +1143,8 @@ class ConfigListOctal(ConfigList, ConfigOctal):
     .. inheritance-diagram:: ConfigListOctal
        :parts: 1
     """
-    pass
+
+    __slots__ = ('_strict', '_provider')
 
 
 class ConfigListHexadecimal(ConfigList, ConfigHexadecimal):
@@ -989,7 +1154,8 @@ class ConfigListHexadecimal(ConfigList, ConfigHexadecimal):
     .. inheritance-diagram:: ConfigListHexadecimal
        :parts: 1
     """
-    pass
+
+    __slots__ = ('_strict', '_provider')
 
 
 class ConfigListBoolean(ConfigList, ConfigBoolean):
@@ -999,7 +1165,8 @@ class ConfigListBoolean(ConfigList, ConfigBoolean):
     .. inheritance-diagram:: ConfigListBoolean
        :parts: 1
     """
-    pass
+
+    __slots__ = ('_strict', '_provider')
 
 
 class ConfigListFloat(ConfigList, ConfigFloat):
@@ -1009,7 +1176,8 @@ class ConfigListFloat(ConfigList, ConfigFloat):
     .. inheritance-diagram:: ConfigListFloat
        :parts: 1
     """
-    pass
+
+    __slots__ = ('_strict', '_provider')
 
 
 class ConfigListDateTime(ConfigList, ConfigDateTime):
@@ -1019,7 +1187,8 @@ class ConfigListDateTime(ConfigList, ConfigDateTime):
     .. inheritance-diagram:: ConfigListDateTime
        :parts: 1
     """
-    pass
+
+    __slots__ = ('_strict', '_provider')
 
 
 class ConfigListDate(ConfigList, ConfigDate):
@@ -1029,7 +1198,8 @@ class ConfigListDate(ConfigList, ConfigDate):
     .. inheritance-diagram:: ConfigListDate
        :parts: 1
     """
-    pass
+
+    __slots__ = ('_strict', '_provider')
 
 
 class ConfigListTime(ConfigList, ConfigTime):
@@ -1039,7 +1209,8 @@ class ConfigListTime(ConfigList, ConfigTime):
     .. inheritance-diagram:: ConfigListTime
        :parts: 1
     """
-    pass
+
+    __slots__ = ('_strict', '_provider')
 
 
 class ConfigListMap(ConfigList, ConfigMap):
@@ -1049,7 +1220,8 @@ class ConfigListMap(ConfigList, ConfigMap):
     .. inheritance-diagram:: ConfigListMap
        :parts: 1
     """
-    pass
+
+    __slots__ = ('_strict', '_provider')
 
 
 class ConfigListClass(ConfigList, ConfigClass):
@@ -1059,7 +1231,8 @@ class ConfigListClass(ConfigList, ConfigClass):
     .. inheritance-diagram:: ConfigListClass
        :parts: 1
     """
-    pass
+
+    __slots__ = ('_strict', '_provider')
 
 
 class ConfigListPath(ConfigList, ConfigPath):
@@ -1069,7 +1242,8 @@ class ConfigListPath(ConfigList, ConfigPath):
     .. inheritance-diagram:: ConfigListPath
        :parts: 1
     """
-    pass
+
+    __slots__ = ('_strict', '_provider')
 
 
 class ConfigListFile(ConfigList, ConfigFile):
@@ -1079,7 +1253,8 @@ class ConfigListFile(ConfigList, ConfigFile):
     .. inheritance-diagram:: ConfigListFile
        :parts: 1
     """
-    pass
+
+    __slots__ = ('_strict', '_provider')
 
 
 class ConfigListDir(ConfigList, ConfigDir):
@@ -1089,7 +1264,8 @@ class ConfigListDir(ConfigList, ConfigDir):
     .. inheritance-diagram:: ConfigListDir
        :parts: 1
     """
-    pass
+
+    __slots__ = ('_strict', '_provider')
 
 
 class ConfigListColor(ConfigList, ConfigColor):
@@ -1099,7 +1275,8 @@ class ConfigListColor(ConfigList, ConfigColor):
     .. inheritance-diagram:: ConfigListColor
        :parts: 1
     """
-    pass
+
+    __slots__ = ('_strict', '_provider')
 
 
 class ConfigListFont(ConfigList, ConfigFont):
@@ -1109,11 +1286,12 @@ class ConfigListFont(ConfigList, ConfigFont):
     .. inheritance-diagram:: ConfigListFont
        :parts: 1
     """
-    pass
+
+    __slots__ = ('_strict', '_provider')
 
 
 # Export ConfigOpt subclasses only
 __all__ = [
     key for key, value in dict(locals()).items()
-    if isclass(value) and issubclass(value, ConfigOpt)
+    if isinstance(value, type) and issubclass(value, ConfigOpt)
 ]
@@ -17,15 +17,148 @@
 
 """
 Module for import/export format providers.
+
+Providers are registered in :data:`providers` by format name, and imported
+the first time they are used. Third-party packages can provide formats with
+entry points in the ``confspec.providers`` group, named after the format:
+
+.. code:: python
+
+   setup(
+       ...
+       entry_points={
+           'confspec.providers': [
+               'yaml = mypackage.yaml:YAMLFormatProvider',
+           ],
+       },
+   )
 """
 
 from __future__ import absolute_import, division, print_function
 
+import sys
+from importlib import import_module
+
+try:
+    from collections.abc import MutableMapping
+except ImportError:
+    from collections import MutableMapping
+
+from ..utils import log
+
+
+__all__ = [
+    'providers', 'FormatProvider', 'ProviderRegistry',
+    'INIFormatProvider', 'JSONFormatProvider', 'DictFormatProvider',
+]
+
+
+ENTRY_POINTS_GROUP = 'confspec.providers'
+"""
+Entry points group of the third-party format providers.
+"""
+
+
+class ProviderRegistry(MutableMapping):
+    """
+    Mapping of format names to format providers.
+
+    Providers can be registered as :class:`FormatProvider` subclasses or as
+    ``'module:Class'`` strings, imported on first access. Formats provided by
+    entry points (see :data:`ENTRY_POINTS_GROUP`) are discovered the first
+    time an unknown format is looked up, or the formats are listed.
+    Explicitly registered formats take precedence over entry points.
+
+    >>> from confspec.providers import providers
+    >>> 'ini' in providers
+    True
+    >>> providers['ini']
+    <class 'confspec.providers.ini.INIFormatProvider'>
+    """
+
+    def __init__(self):
+        self._providers = {}
+        self._discovered = False
+
+    def register(self, format, provider):
+        """
+        Register a format provider.
+
+        :param str format: Name of the format.
+        :param provider: :class:`FormatProvider` subclass, or
+         ``'module:Class'`` string to import it from on first access.
+        """
+        self._providers[format] = provider
+
+    def __getitem__(self, format):
+        provider = self._providers.get(format)
+        if provider is None:
+            self._discover()
+            provider = self._providers[format]
+
+        if isinstance(provider, str):
+            module, name = provider.split(':')
+            provider = getattr(import_module(module), name)
+            self._providers[format] = provider
+        return provider
+
+    def __setitem__(self, format, provider):
+        self.register(format, provider)
+
+    def __delitem__(self, format):
+        del self._providers[format]
+
+    def __contains__(self, format):
+        if format not in self._providers:
+            self._discover()
+        return format in self._providers
+
+    def __iter__(self):
+        self._discover()
+        return iter(list(self._providers))
+
+    def __len__(self):
+        self._discover()
+        return len(self._providers)
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, sorted(self))
 
-__all__ = ['providers', 'FormatProvider']
+    def _discover(self):
+        """
+        Register the providers of the installed entry points, once.
+        """
+        if self._discovered:
+            return
+        self._discovered = True
+
+        for entry_point in _entry_points():
+            if entry_point.name not in self._providers:
+                self._providers[entry_point.name] = entry_point.value
+
+
+def _entry_points():
+    """
+    Return the entry points of :data:`ENTRY_POINTS_GROUP`.
+    """
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        return []
+
+    entry_points = entry_points()
+    if hasattr(entry_points, 'select'):
+        return entry_points.select(group=ENTRY_POINTS_GROUP)
+    return entry_points.get(ENTRY_POINTS_GROUP, [])
 
 
-providers = {}
+providers = ProviderRegistry()
+"""
+Registry of the format providers. See :class:`ProviderRegistry`.
+"""
+providers.register('ini', 'confspec.providers.ini:INIFormatProvider')
+providers.register('json', 'confspec.providers.json:JSONFormatProvider')
+providers.register('dict', 'confspec.providers.dict:DictFormatProvider')
 
 
 class FormatProvider(object):
@@ -35,20 +168,78 @@ class FormatProvider(object):
     """
 
     @classmethod
-    def do_import(cls, cfmg, string):
+    def do_import(cls, cfmg, source):
         """
-        Interpret a string encoded in the format provided by this object and
-        import the configuration within.
+        Interpret a configuration encoded in the format provided by this object
+        and import the configuration within.
 
-        This function must be implemented by any subclass.
+        The default implementation stages the configuration with
+        :meth:`do_stage` and then validates and applies all the staged values
+        at once, so an import that fails leaves the configuration unchanged.
+        Subclasses must implement either this function or :meth:`do_stage`.
+
+        :param ConfigMg cfmg: The Config Manager object handling the
+         configuration specification. See :class:`confspec.manager.ConfigMg`.
+        :param source: The configuration encoded in the format provided by
+         this object to be imported. A string, a text or binary file object or
+         any iterable of lines. See :func:`confspec.utils.iter_lines`.
+
+         .. versionchanged:: 1.5
+
+            Added support for file objects and iterables of lines.
+        """
+        staged = cls.do_stage(cfmg, source)
+        cfmg._apply_staged(staged)
+
+    @classmethod
+    def do_stage(cls, cfmg, source, report=None):
+        """
+        Interpret a configuration encoded in the format provided by this object
+        without importing it.
+
+        Syntax errors, and keys found in the wrong category, raise an
+        exception unless the Config Manager is in safe mode, in which case
+        they are logged and skipped. Values are not validated.
+
+        .. versionadded:: 1.5
 
         :param ConfigMg cfmg: The Config Manager object handling the
          configuration specification. See :class:`confspec.manager.ConfigMg`.
-        :param str string: The string with a configuration encoded in the
-         format provided by this object to be imported.
+        :param source: The configuration encoded in the format provided by
+         this object. See :meth:`do_import`.
+        :param report: If given, errors and ignored keys are added to this
+         :class:`confspec.report.ValidationReport` instead, with the line of
+         each staged key if the format tracks lines. See :meth:`_error` and
+         :meth:`_ignore`.
+        :rtype: An :py:class:`collections.OrderedDict` mapping the keys of the
+         specification found in the configuration to their values, as found.
         """
         raise NotImplementedError()
 
+    @classmethod
+    def _error(cls, cfmg, report, message, line=None, key=None):
+        """
+        Handle an error found by :meth:`do_stage`: add it to the report if
+        given, otherwise raise :py:exc:`SyntaxError` or, in safe mode, log it.
+        """
+        if report is not None:
+            report.error(message, line, key)
+        elif not cfmg._safe:
+            raise SyntaxError(message)
+        else:
+            log.error(message)
+
+    @classmethod
+    def _ignore(cls, report, message, line=None, key=None):
+        """
+        Handle a part of the configuration ignored by :meth:`do_stage`: add it
+        to the report as a warning if given, otherwise log it.
+        """
+        if report is not None:
+            report.warning(message, line, key)
+        else:
+            log.error(message)
+
     @classmethod
     def do_export(cls, cfmg):
         """
@@ -64,7 +255,63 @@ class FormatProvider(object):
         """
         raise NotImplementedError()
 
+    @classmethod
+    def _render(cls, option):
+        """
+        Render the fragment of the export that represents the given option.
+
+        Providers that want to cache rendered fragments using
+        :meth:`_rendered` must implement this function.
+
+        :param ConfigOpt option: The option to render.
+        :rtype: The rendered fragment.
+        """
+        raise NotImplementedError()
+
+    @classmethod
+    def _rendered(cls, cfmg, option):
+        """
+        Return the fragment rendered by :meth:`_render` for the given option.
+
+        Fragments are cached per configuration manager and re-rendered only
+        when a new value is assigned to the option, so exporting costs in
+        proportion to the number of options changed since the last export.
+
+        :param ConfigMg cfmg: The Config Manager object handling the
+         configuration specification. See :class:`confspec.manager.ConfigMg`.
+        :param ConfigOpt option: The option to render.
+        :rtype: The rendered fragment.
+        """
+        fragments = cfmg._fragments.get(cls)
+        if fragments is None:
+            fragments = cfmg._fragments[cls] = {}
+
+        revision = option._revision
+        cached = fragments.get(option._key)
+        if cached is None or cached[0] != revision:
+            cached = (revision, cls._render(option))
+            fragments[option._key] = cached
+        return cached[1]
+
+
+def __getattr__(name):
+    """
+    Import the built-in providers lazily.
+    """
+    modules = {
+        'INIFormatProvider': '.ini',
+        'JSONFormatProvider': '.json',
+        'DictFormatProvider': '.dict',
+    }
+    if name in modules:
+        return getattr(import_module(modules[name], __name__), name)
+    raise AttributeError(
+        'module \'{}\' has no attribute \'{}\''.format(__name__, name)
+    )
+
 
-from .ini import *  # noqa
-from .json import *  # noqa
-from .dict import *  # noqa
+# Module attributes can't be loaded lazily before Python 3.7 (PEP 562)
+if sys.version_info < (3, 7):
+    from .ini import INIFormatProvider  # noqa
+    from .json import JSONFormatProvider  # noqa
+    from .dict import DictFormatProvider  # noqa
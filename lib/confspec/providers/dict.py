@@ -23,9 +23,11 @@ from __future__ import absolute_import, division, print_function
 
 import logging as log
 from traceback import format_exc
+from collections import OrderedDict
 from pprint import pformat
 
-from . import FormatProvider, providers
+from . import FormatProvider
+from ..utils import read_text
 
 
 __all__ = ['DictFormatProvider']
@@ -40,51 +42,50 @@ class DictFormatProvider(FormatProvider):
     """
 
     @classmethod
-    def do_import(cls, cfmg, string):
+    def do_stage(cls, cfmg, source, report=None):
         """
         Python dictionary parser implementation.
 
-        See :meth:`FormatProvider.do_import`.
-        """
+        The format cannot be parsed incrementally, so the whole source is read
+        before parsing.
 
+        See :meth:`FormatProvider.do_stage`.
+        """
+        staged = OrderedDict()
         keys = cfmg._keys
         categories = cfmg._categories
 
         # Evaluate string
         try:
-            as_dict = eval(string)
+            as_dict = eval(read_text(source))
         except Exception as e:
+            if report is not None:
+                report.error(str(e), getattr(e, 'lineno', None))
+                return staged
             if not cfmg._safe:
                 raise e
             log.error(format_exc())
-            return
+            return staged
 
         # Check datatype
         if type(as_dict) != dict:
-            msg = 'Cannot evaluate string as dictionary.'
-            if not cfmg._safe:
-                raise SyntaxError(msg)
-            log.error(msg)
-            return
+            cls._error(cfmg, report, 'Cannot evaluate string as dictionary.')
+            return staged
 
         # Iterate categories
         for category, options in as_dict.items():
 
             # Check datatype
             if type(options) != dict:
-                if not cfmg._safe:
-                    raise SyntaxError(
-                        'Malformed category "{}".'.format(category)
-                    )
-                log.error(
-                    'Ignoring malformed category "{}".'.format(category)
+                cls._error(
+                    cfmg, report, 'Malformed category "{}".'.format(category)
                 )
                 continue
 
             # Consider only the categories included in the specification
             if category not in categories:
-                log.error(
-                    'Ignoring unknown category "{}".'.format(category)
+                cls._ignore(
+                    report, 'Ignoring unknown category "{}".'.format(category)
                 )
                 continue
 
@@ -93,29 +94,28 @@ class DictFormatProvider(FormatProvider):
 
                 # Consider only known keys
                 if key not in keys:
-                    log.error('Ignoring unknown key "{}".'.format(key))
+                    cls._ignore(
+                        report, 'Ignoring unknown key "{}".'.format(key),
+                        key=key
+                    )
                     continue
 
                 # Check if key belongs to the category we are in
                 if keys[key].category != category:
-                    msg = (
+                    cls._error(
+                        cfmg, report,
                         'Key "{}" should belong to category "{}", '
                         'found in "{}" instead.'.format(
                             key, keys[key].category, category
-                        )
+                        ),
+                        key=key
                     )
-                    if not cfmg._safe:
-                        raise SyntaxError(msg)
-                    log.error(msg)
                     continue
 
-                # Everything ok, try to set the value of the option
-                try:
-                    cfmg.set(key, value)
-                except Exception as e:
-                    if not cfmg._safe:
-                        raise e
-                    log.error(format_exc())
+                # Everything ok, stage the value of the option
+                staged[key] = value
+
+        return staged
 
     @classmethod
     def do_export(cls, cfmg):
@@ -132,11 +132,21 @@ class DictFormatProvider(FormatProvider):
         # FIXME: Add support for comments?
         as_dict = {
             cat: {
-                opt.key: opt.repr(opt._value) for opt in categories[cat]
+                opt.key: cls._rendered(cfmg, opt) for opt in categories[cat]
             } for cat in categories
         }
 
         output = pformat(as_dict)
         return output
 
-providers['dict'] = DictFormatProvider
+    @classmethod
+    def _render(cls, option):
+        """
+        Return the representation of the value of an option.
+
+        The layout of the output depends on the whole dictionary, so only the
+        representation of each value is cached.
+
+        See :meth:`FormatProvider._render`.
+        """
+        return option.repr(option._value)
@@ -21,16 +21,23 @@ INI format provider for confspec.
 
 from __future__ import absolute_import, division, print_function
 
-import logging as log
-from traceback import format_exc
-from re import compile as regex
+from collections import OrderedDict
 
-from . import FormatProvider, providers
+from . import FormatProvider
+from ..utils import iter_lines
 
 
 __all__ = ['INIFormatProvider']
 
 
+def _is_word(text):
+    """
+    Check if a text is made only of word characters, that is, alphanumeric
+    characters and the underscore.
+    """
+    return text.replace('_', 'a').isalnum()
+
+
 class INIFormatProvider(FormatProvider):
     """
     INI format provider.
@@ -38,79 +45,121 @@ class INIFormatProvider(FormatProvider):
     Note that ``confspec`` uses it's own parser and reader implementation.
     """
 
-    section_regex = r'^\[ *(?P<section>\w+) *]$'
-    """Regular expression that matches sections."""
-    _compiled_section_regex = regex(section_regex)
-
-    property_regex = r'^ *(?P<key>\w+) *= *(?P<value>.+)$'
-    """Regular expression that matches properties."""
-    _compiled_property_regex = regex(property_regex)
-
-    @classmethod
-    def do_import(cls, cfmg, string):
+    @staticmethod
+    def _tokenize(source):
         """
-        INI parser implementation.
-
-        See :meth:`FormatProvider.do_import`.
+        Classify each line of the source in a single pass.
+
+        Comments and empty lines are skipped. Sections are written as
+        ``[name]`` and properties as ``key = value``, where names and keys are
+        made of word characters and the value can't be empty.
+
+        :param source: Source to parse, see :func:`confspec.utils.iter_lines`.
+        :rtype: An iterator of tuples ``(lnum, section, key, value)`` with the
+         line number, the section the line is in, and the key and the stripped
+         value of a property. Both ``key`` and ``value`` are ``None`` for the
+         line that opens a section, and ``key`` is ``None`` and ``value`` is
+         the line for lines that can't be parsed.
         """
-        keys = cfmg._keys
-        categories = cfmg._categories
         section = 'general'
 
-        for lnum, line in enumerate(string.split('\n'), 1):
+        for lnum, line in enumerate(iter_lines(source), 1):
             line = line.strip()
 
             # Ignore comments and empty lines
-            if not line or line.startswith(';'):
+            if not line or line[0] == ';':
                 continue
 
             # Change section we are if a new section is found
-            match = cls._compiled_section_regex.match(line)
-            if match:
-                section = match.group('section')
+            if line[0] == '[':
+                name = line[1:-1].strip(' ')
+                if line[-1] == ']' and _is_word(name):
+                    section = name
+                    yield lnum, section, None, None
+                else:
+                    yield lnum, section, None, line
                 continue
 
             # Parse a property
-            match = cls._compiled_property_regex.match(line)
-            if not match:
-                if not cfmg._safe:
-                    raise SyntaxError(
-                        'Cannot parse line {} : "{}".'.format(lnum, line)
-                    )
-                log.error(
-                    'Parse error, ignoring line {} "{}".'.format(
-                        lnum, line
+            key, equal, value = line.partition('=')
+            key = key.rstrip(' ')
+            if not value or not _is_word(key):
+                yield lnum, section, None, line
+                continue
+
+            yield lnum, section, key, value.strip()
+
+    @classmethod
+    def do_stage(cls, cfmg, source, report=None):
+        """
+        INI parser implementation.
+
+        The source is parsed line by line.
+
+        See :meth:`FormatProvider.do_stage`.
+        """
+        staged = OrderedDict()
+        lines = report.lines if report is not None else None
+        keys = cfmg._keys
+        categories = cfmg._categories
+        known = 'general' in categories
+        reported = False
+        opened = None
+
+        for lnum, section, key, value in cls._tokenize(source):
+
+            if key is None:
+                # Report lines that can't be parsed
+                if value is not None:
+                    cls._error(
+                        cfmg, report,
+                        'Cannot parse line {} : "{}".'.format(lnum, value),
+                        lnum
                     )
-                )
+                    continue
+
+                known = section in categories
+                reported = False
+                opened = lnum
                 continue
 
-            key = match.group('key')
+            # Skip the properties of sections not in the specification
+            if not known:
+                if not reported:
+                    cls._ignore(
+                        report, 'Ignoring section [{}].'.format(section),
+                        opened or lnum
+                    )
+                    reported = True
+                continue
 
-            # Consider only the sections and keys in the specification
-            if section not in categories or key not in keys:
-                log.error('Ignoring "{}" in [{}].'.format(key, section))
+            # Consider only the keys in the specification
+            option = keys.get(key)
+            if option is None:
+                cls._ignore(
+                    report, 'Ignoring "{}" in [{}].'.format(key, section),
+                    lnum, key
+                )
                 continue
 
             # Check if key belongs to the section we are in
-            if keys[key].category != section:
-                msg = (
+            if option.category != section:
+                cls._error(
+                    cfmg, report,
                     'Property "{}" should belong to section "[{}]", '
                     'found in "[{}]" instead.'.format(
-                        key, keys[key].category, section
-                    )
+                        key, option.category, section
+                    ),
+                    lnum, key
                 )
-                if not cfmg._safe:
-                    raise SyntaxError(msg)
-                log.error(msg)
                 continue
 
-            # Everything ok, try to set the value of the property
-            try:
-                cfmg.set(key, match.group('value').strip())
-            except Exception as e:
-                if not cfmg._safe:
-                    raise e
-                log.error(format_exc())
+            # Everything ok, stage the value of the property
+            staged[key] = value
+            if lines is not None:
+                lines[key] = lnum
+
+        return staged
 
     @classmethod
     def do_export(cls, cfmg):
@@ -127,24 +176,31 @@ class INIFormatProvider(FormatProvider):
             # Write category
             output.append('[{}]'.format(category))
 
+            # Write options
             options = sorted(categories[category])
             for option in options:
-
-                # Write a comment for option if available
-                comment = option.comment.strip()
-                if comment:
-                    output.extend(
-                        ['; {}'.format(l) for l in comment.split('\n')]
-                    )
-
-                # Write option
-                formatted = '{} = {}'.format(
-                    option.key, repr(option)
-                )
-                output.append(formatted)
+                output.append(cls._rendered(cfmg, option))
             output.append('')
 
         # Compile all lines
         return '\n'.join(output)
 
-providers['ini'] = INIFormatProvider
+    @classmethod
+    def _render(cls, option):
+        """
+        Render the comment (if available) and the property of an option.
+
+        See :meth:`FormatProvider._render`.
+        """
+        lines = []
+
+        # Write a comment for option if available
+        comment = option.comment.strip()
+        if comment:
+            lines.extend(
+                ['; {}'.format(l) for l in comment.split('\n')]
+            )
+
+        # Write option
+        lines.append('{} = {}'.format(option.key, repr(option)))
+        return '\n'.join(lines)
@@ -23,9 +23,11 @@ from __future__ import absolute_import, division, print_function
 
 import logging as log
 from traceback import format_exc
+from collections import OrderedDict
 from json import loads, dumps
 
-from . import FormatProvider, providers
+from . import FormatProvider
+from ..utils import read_text
 
 
 __all__ = ['JSONFormatProvider']
@@ -39,51 +41,50 @@ class JSONFormatProvider(FormatProvider):
     """
 
     @classmethod
-    def do_import(cls, cfmg, string):
+    def do_stage(cls, cfmg, source, report=None):
         """
         JSON parser implementation.
 
-        See :meth:`FormatProvider.do_import`.
-        """
+        The format cannot be parsed incrementally, so the whole source is read
+        before parsing.
 
+        See :meth:`FormatProvider.do_stage`.
+        """
+        staged = OrderedDict()
         keys = cfmg._keys
         categories = cfmg._categories
 
         # Parse JSON
         try:
-            as_dict = loads(string)
+            as_dict = loads(read_text(source))
         except Exception as e:
+            if report is not None:
+                report.error(str(e), getattr(e, 'lineno', None))
+                return staged
             if not cfmg._safe:
                 raise e
             log.error(format_exc())
-            return
+            return staged
 
         # Parse type
         if type(as_dict) != dict:
-            msg = 'Cannot parse JSON as dictionary.'
-            if not cfmg._safe:
-                raise SyntaxError(msg)
-            log.error(msg)
-            return
+            cls._error(cfmg, report, 'Cannot parse JSON as dictionary.')
+            return staged
 
         # Iterate categories
         for category, options in as_dict.items():
 
             # Check datatype
             if type(options) != dict:
-                if not cfmg._safe:
-                    raise SyntaxError(
-                        'Malformed category "{}".'.format(category)
-                    )
-                log.error(
-                    'Ignoring malformed category "{}".'.format(category)
+                cls._error(
+                    cfmg, report, 'Malformed category "{}".'.format(category)
                 )
                 continue
 
             # Consider only the categories included in the specification
             if category not in categories:
-                log.error(
-                    'Ignoring unknown category "{}".'.format(category)
+                cls._ignore(
+                    report, 'Ignoring unknown category "{}".'.format(category)
                 )
                 continue
 
@@ -92,29 +93,28 @@ class JSONFormatProvider(FormatProvider):
 
                 # Consider only known keys
                 if key not in keys:
-                    log.error('Ignoring unknown key "{}".'.format(key))
+                    cls._ignore(
+                        report, 'Ignoring unknown key "{}".'.format(key),
+                        key=key
+                    )
                     continue
 
                 # Check if key belongs to the category we are in
                 if keys[key].category != category:
-                    msg = (
+                    cls._error(
+                        cfmg, report,
                         'Key "{}" should belong to category "{}", '
                         'found in "{}" instead.'.format(
                             key, keys[key].category, category
-                        )
+                        ),
+                        key=key
                     )
-                    if not cfmg._safe:
-                        raise SyntaxError(msg)
-                    log.error(msg)
                     continue
 
-                # Everything ok, try to set the value of the option
-                try:
-                    cfmg.set(key, value)
-                except Exception as e:
-                    if not cfmg._safe:
-                        raise e
-                    log.error(format_exc())
+                # Everything ok, stage the value of the option
+                staged[key] = value
+
+        return staged
 
     @classmethod
     def do_export(cls, cfmg):
@@ -127,21 +127,20 @@ class JSONFormatProvider(FormatProvider):
 
         output = None
 
-        # Create dictionary
-        as_dict = {
-            cat: {
-                opt.key: opt.repr(opt._value) for opt in categories[cat]
-            } for cat in categories
-        }
-
-        # Try to convert dictionary to JSON
+        # Create JSON object from the rendered members of each category. The
+        # result is the same produced by json.dumps() with 4 spaces indent and
+        # sorted keys.
         try:
-            output = dumps(
-                as_dict,
-                indent=4,
-                sort_keys=True,
-                separators=(',', ': ')
-            )
+            members = []
+            for category in sorted(categories):
+                options = sorted(categories[category])
+                members.append('    {}: {{\n{}\n    }}'.format(
+                    dumps(category),
+                    ',\n'.join(
+                        [cls._rendered(cfmg, option) for option in options]
+                    )
+                ))
+            output = '{{\n{}\n}}'.format(',\n'.join(members))
         except Exception as e:
             if not cfmg._safe:
                 raise e
@@ -149,4 +148,20 @@ class JSONFormatProvider(FormatProvider):
 
         return output
 
-providers['json'] = JSONFormatProvider
+    @classmethod
+    def _render(cls, option):
+        """
+        Render the JSON object member of an option, indented to be part of
+        a category object.
+
+        See :meth:`FormatProvider._render`.
+        """
+        value = dumps(
+            option.repr(option._value),
+            indent=4,
+            sort_keys=True,
+            separators=(',', ': ')
+        )
+        return '        {}: {}'.format(
+            dumps(option.key), value.replace('\n', '\n        ')
+        )
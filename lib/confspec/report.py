@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Module for reports of configuration documents validation.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from collections import namedtuple
+
+
+__all__ = ['ValidationIssue', 'ValidationReport']
+
+
+ValidationIssue = namedtuple('ValidationIssue', ['line', 'key', 'message'])
+"""
+An issue found in a configuration document: the line it was found in (or
+``None`` if the format doesn't track lines), the key it affects (or ``None``)
+and a message describing it.
+"""
+
+
+class ValidationReport(object):
+    """
+    Report of the issues found in a configuration document by
+    :meth:`confspec.manager.ConfigMg.validate`.
+
+    A report is true if the document is valid, that is, if it has no errors:
+
+    >>> from confspec.report import ValidationReport
+    >>> report = ValidationReport('ini')
+    >>> report.error('Cannot parse "port".', line=3)
+    >>> report.warning('Ignoring section [foo].', line=5)
+    >>> bool(report)
+    False
+    >>> print(report)
+    line 3: Cannot parse "port".
+    line 5: warning: Ignoring section [foo].
+
+    :param str format: Format of the document.
+    """
+
+    def __init__(self, format):
+        self.format = format
+        """Format of the document."""
+        self.errors = []
+        """
+        List of :class:`ValidationIssue` that would make an import fail,
+        like syntax errors and values that can't be validated.
+        """
+        self.warnings = []
+        """
+        List of :class:`ValidationIssue` that an import ignores, like
+        unknown keys and categories.
+        """
+        self.lines = {}
+        """Mapping of keys to the line they were found in, if tracked."""
+
+    @property
+    def valid(self):
+        """
+        ``True`` if the document has no errors.
+        """
+        return not self.errors
+
+    def error(self, message, line=None, key=None):
+        """
+        Add an error to the report.
+        """
+        self.errors.append(ValidationIssue(line, key, message))
+
+    def warning(self, message, line=None, key=None):
+        """
+        Add a warning to the report.
+        """
+        self.warnings.append(ValidationIssue(line, key, message))
+
+    def __bool__(self):
+        return self.valid
+
+    __nonzero__ = __bool__
+
+    def __repr__(self):
+        return '<ValidationReport {} errors={} warnings={}>'.format(
+            self.format, len(self.errors), len(self.warnings)
+        )
+
+    def __str__(self):
+        issues = [(issue, '') for issue in self.errors]
+        issues.extend((issue, 'warning: ') for issue in self.warnings)
+        issues.sort(key=lambda item: (
+            item[0].line is None, item[0].line or 0
+        ))
+
+        lines = []
+        for issue, kind in issues:
+            where = 'line {}: '.format(issue.line) \
+                if issue.line is not None else ''
+            lines.append('{}{}{}'.format(where, kind, issue.message))
+        return '\n'.join(lines)
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+
+"""
+Module for publishing the configuration state in shared memory.
+
+This module requires :py:mod:`multiprocessing.shared_memory` (Python 3.8 or
+newer) and is only imported when publication is used.
+
+The shared memory segment starts with a header of three unsigned 64 bits
+integers: a sequence number, the generation of the configuration and the
+size of the payload, followed by the payload, the pickled mapping of each key
+to its internal value. The sequence number is odd while the publisher writes
+the segment, so subscribers retry until they read the same even sequence
+number before and after reading the payload (a seqlock).
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import pickle
+from time import sleep, time
+from struct import Struct
+from multiprocessing import shared_memory, resource_tracker
+
+
+__all__ = ['SharedPublisher', 'SharedSubscriber']
+
+
+_HEADER = Struct('<QQQ')
+
+# Seconds subscribers wait for the publisher to finish writing
+READ_TIMEOUT = 1.0
+
+# Names of the segments published by this process
+_published = set()
+
+
+class SharedPublisher(object):
+    """
+    Publisher of the state of a configuration manager in a shared memory
+    segment.
+
+    Instances are created with :meth:`confspec.manager.ConfigMg.publish`.
+
+    :param cfmg: The :class:`confspec.manager.ConfigMg` to publish.
+    :param str name: Name of the shared memory segment, or ``None`` for a
+     random name.
+    :param int size: Size of the payload area of the segment, in bytes, or
+     ``None`` to use four times the size of the current configuration (and
+     at least 1 MiB). The size can't change once the segment is created.
+    """
+
+    def __init__(self, cfmg, name=None, size=None):
+        self._cfmg = cfmg
+        self._sequence = 0
+
+        payload = self._dump()
+        if size is None:
+            size = max(4 * len(payload), 1024 * 1024)
+
+        self._shm = shared_memory.SharedMemory(
+            name=name, create=True, size=_HEADER.size + size
+        )
+        _published.add(self._shm._name)
+        self._write(payload)
+
+    @property
+    def name(self):
+        """
+        Name of the shared memory segment, to be passed to the subscribers.
+        """
+        return self._shm.name
+
+    def publish(self):
+        """
+        Publish the current state of the configuration.
+
+        :raises ValueError: If the configuration doesn't fit in the segment.
+        """
+        if self._shm is not None:
+            self._write(self._dump())
+
+    def close(self, unlink=True):
+        """
+        Stop publishing and close the shared memory segment.
+
+        :param bool unlink: Also destroy the segment. Subscribers that
+         already attached keep their mapping.
+        """
+        if self._shm is None:
+            return
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+            _published.discard(self._shm._name)
+        self._shm = None
+
+    def _dump(self):
+        """
+        Serialize the internal values of the configuration.
+        """
+        return pickle.dumps(
+            {key: opt._value for key, opt in self._cfmg._keys.items()},
+            pickle.HIGHEST_PROTOCOL
+        )
+
+    def _write(self, payload):
+        """
+        Write a payload under the seqlock.
+        """
+        buf = self._shm.buf
+        if _HEADER.size + len(payload) > len(buf):
+            raise ValueError(
+                'Configuration of {} bytes doesn\'t fit in shared memory '
+                'segment \'{}\' of {} bytes.'.format(
+                    len(payload), self.name, len(buf) - _HEADER.size
+                )
+            )
+
+        generation = self._cfmg._generation
+        self._sequence += 1
+        _HEADER.pack_into(buf, 0, self._sequence, generation, len(payload))
+        buf[_HEADER.size:_HEADER.size + len(payload)] = payload
+        self._sequence += 1
+        _HEADER.pack_into(buf, 0, self._sequence, generation, len(payload))
+
+
+class SharedSubscriber(object):
+    """
+    Read-only view of a configuration published by a
+    :class:`SharedPublisher`.
+
+    Instances are created with :meth:`confspec.manager.ConfigMg.subscribe`.
+
+    :param str name: Name of the shared memory segment.
+    """
+
+    def __init__(self, name):
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Before Python 3.13 attaching registers the segment in the
+            # resource tracker, which would destroy it when this process
+            # exits, unless this process is also the publisher
+            self._shm = shared_memory.SharedMemory(name=name)
+            if self._shm._name not in _published:
+                resource_tracker.unregister(self._shm._name, 'shared_memory')
+
+    @property
+    def name(self):
+        """
+        Name of the shared memory segment.
+        """
+        return self._shm.name
+
+    @property
+    def generation(self):
+        """
+        Generation of the published configuration.
+        """
+        return _HEADER.unpack_from(self._shm.buf, 0)[1]
+
+    def read(self, timeout=None):
+        """
+        Read the published configuration.
+
+        :param float timeout: Maximum number of seconds to wait for the
+         publisher to finish writing the segment, or ``None`` for
+         ``READ_TIMEOUT``.
+        :raises TimeoutError: If the publisher doesn't finish writing in time,
+         for example because it died while writing.
+        :rtype: The generation of the configuration and the mapping of each
+         key to its internal value.
+        """
+        if timeout is None:
+            timeout = READ_TIMEOUT
+
+        buf = self._shm.buf
+        deadline = None
+        while True:
+            sequence, generation, size = _HEADER.unpack_from(buf, 0)
+            if sequence % 2:
+                if deadline is None:
+                    deadline = time() + timeout
+                elif time() > deadline:
+                    raise TimeoutError(
+                        'Shared memory segment \'{}\' is still being written '
+                        'after {} seconds.'.format(self.name, timeout)
+                    )
+                sleep(0)
+                continue
+
+            payload = bytes(buf[_HEADER.size:_HEADER.size + size])
+            if _HEADER.unpack_from(buf, 0)[0] == sequence:
+                return generation, pickle.loads(payload)
+
+    def close(self):
+        """
+        Detach from the shared memory segment.
+        """
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
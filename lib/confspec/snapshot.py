@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""
+Module for immutable configuration snapshots.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+
+__all__ = ['ConfigSnapshot']
+
+
+class ConfigSnapshot(Mapping):
+    """
+    Immutable view of the values of a configuration at a given generation.
+
+    Snapshots are mappings of keys to values, and values can also be read
+    as attributes:
+
+    >>> from confspec.snapshot import ConfigSnapshot
+    >>> snapshot = ConfigSnapshot({'port': 8080, 'hosts': ['a', 'b']}, 1)
+    >>> snapshot['port'], snapshot.port
+    (8080, 8080)
+    >>> snapshot.hosts
+    ('a', 'b')
+
+    Lists are stored as tuples so snapshots can be shared between threads
+    without copying and, if all values are hashable, snapshots are hashable.
+
+    :param dict values: Mapping of keys to values.
+    :param int generation: Generation of the configuration the values belong
+     to.
+    """
+
+    __slots__ = ('_values', '_generation', '_hash')
+
+    def __init__(self, values, generation=0):
+        self._init({
+            key: _freeze(value) for key, value in values.items()
+        }, generation)
+
+    def _init(self, values, generation):
+        object.__setattr__(self, '_values', values)
+        object.__setattr__(self, '_generation', generation)
+        object.__setattr__(self, '_hash', None)
+
+    @property
+    def generation(self):
+        """
+        Generation of the configuration the values belong to. Generations
+        increase every time the configuration changes.
+        """
+        return self._generation
+
+    def evolve(self, changes, generation):
+        """
+        Return a new snapshot with the given changes applied.
+
+        :param dict changes: Mapping of keys to new values.
+        :param int generation: Generation of the new snapshot.
+        :rtype: A :class:`ConfigSnapshot`.
+        """
+        values = dict(self._values)
+        for key, value in changes.items():
+            values[key] = _freeze(value)
+
+        snapshot = ConfigSnapshot.__new__(ConfigSnapshot)
+        snapshot._init(values, generation)
+        return snapshot
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __getattr__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        raise TypeError('Snapshots are immutable.')
+
+    def __delattr__(self, name):
+        raise TypeError('Snapshots are immutable.')
+
+    def __eq__(self, other):
+        if isinstance(other, ConfigSnapshot):
+            return self._values == other._values
+        return Mapping.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        if self._hash is None:
+            object.__setattr__(
+                self, '_hash', hash(frozenset(self._values.items()))
+            )
+        return self._hash
+
+    def __repr__(self):
+        return 'ConfigSnapshot({!r}, generation={})'.format(
+            self._values, self._generation
+        )
+
+
+def _freeze(value):
+    """
+    Convert lists (recursively) to tuples.
+    """
+    if isinstance(value, list):
+        return tuple(_freeze(element) for element in value)
+    return value
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+
+"""
+Module for the instrumentation of the configuration manager.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from time import time
+from threading import Lock
+from bisect import bisect_left
+
+try:
+    from time import perf_counter as clock
+except ImportError:
+    clock = time
+
+
+__all__ = ['Instrumentation']
+
+
+BUCKETS = (
+    0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005,
+    0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0
+)
+"""
+Upper bounds, in seconds, of the buckets of the latency histograms.
+"""
+
+PHASES = {
+    'read': 'Reading a file of the file stack, by file.',
+    'import': 'Importing a configuration, by format.',
+    'parse': 'Parsing a value, by key.',
+    'validate': 'Validating a value, by key.',
+    'listener': 'Calling a listener, by key.',
+    'batch_listener': 'Calling a batch listener.',
+    'export': 'Exporting the configuration, by format.',
+    'write': 'Writing a file of the file stack, by file.',
+}
+"""
+Phases timed by the instrumentation, and their description.
+"""
+
+COUNTERS = {
+    'changes': 'Values changed, by key.',
+    'errors': 'Errors, by phase.',
+    'reloads': 'Files reloaded, by file.',
+}
+"""
+Counters of the instrumentation, and their description.
+"""
+
+
+class Instrumentation(object):
+    """
+    Counters and latency histograms of the phases of the configuration
+    manager.
+
+    Instances are created with
+    :meth:`confspec.manager.ConfigMg.enable_instrumentation`. Each phase (see
+    :data:`PHASES`) and counter (see :data:`COUNTERS`) is recorded by label:
+    the key, file or format the phase or counter applies to.
+
+    >>> from confspec.stats import Instrumentation
+    >>> instrumentation = Instrumentation()
+    >>> instrumentation.observe('parse', 'port', 0.0002)
+    >>> instrumentation.count('changes', 'port')
+    >>> instrumentation.as_dict()['counters']
+    {'changes': {'port': 1}}
+    >>> print(instrumentation.prometheus().splitlines()[-1])
+    confspec_events_total{event="changes",label="port"} 1
+
+    :param bool per_key: Record the phases and counters that apply to a key
+     by key. If ``False``, they are recorded with an empty label, which keeps
+     the number of series low for large configurations.
+    """
+
+    clock = staticmethod(clock)
+    """
+    Clock used to time the phases.
+    """
+
+    def __init__(self, per_key=True):
+        self.per_key = per_key
+        self._lock = Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def observe(self, phase, label, seconds):
+        """
+        Record the duration of a phase.
+
+        :param str phase: Name of the phase.
+        :param str label: Key, file or format the phase applies to, or
+         ``None``.
+        :param float seconds: Duration of the phase.
+        """
+        with self._lock:
+            histogram = self._histograms.get((phase, label))
+            if histogram is None:
+                histogram = self._histograms[(phase, label)] = (
+                    [0] * (len(BUCKETS) + 1) + [0.0, 0.0]
+                )
+            histogram[bisect_left(BUCKETS, seconds)] += 1
+            histogram[-2] += seconds
+            histogram[-1] = max(histogram[-1], seconds)
+
+    def count(self, counter, label, increment=1):
+        """
+        Increment a counter.
+
+        :param str counter: Name of the counter.
+        :param str label: Key, file or phase the counter applies to, or
+         ``None``.
+        :param int increment: Increment of the counter.
+        """
+        with self._lock:
+            key = (counter, label)
+            self._counters[key] = self._counters.get(key, 0) + increment
+
+    def reset(self):
+        """
+        Reset all counters and histograms.
+        """
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def as_dict(self):
+        """
+        Return the counters and histograms.
+
+        :rtype: A dictionary with a ``phases`` dictionary, mapping each phase
+         to a dictionary mapping each label to its ``count``, ``sum`` and
+         ``max`` of seconds and ``buckets`` (list of number of observations
+         of each bucket, see :data:`BUCKETS`, the last one being unbounded);
+         and a ``counters`` dictionary, mapping each counter to a dictionary
+         mapping each label to its value.
+        """
+        phases = {}
+        counters = {}
+        with self._lock:
+            for (phase, label), histogram in self._histograms.items():
+                buckets = histogram[:-2]
+                phases.setdefault(phase, {})[label] = {
+                    'count': sum(buckets),
+                    'sum': histogram[-2],
+                    'max': histogram[-1],
+                    'buckets': buckets,
+                }
+            for (counter, label), value in self._counters.items():
+                counters.setdefault(counter, {})[label] = value
+        return {'phases': phases, 'counters': counters}
+
+    def prometheus(self, prefix='confspec'):
+        """
+        Return the counters and histograms in the Prometheus text exposition
+        format.
+
+        Histograms are exported as ``<prefix>_phase_seconds`` with ``phase``
+        and ``label`` labels, and counters as ``<prefix>_events_total`` with
+        ``event`` and ``label`` labels.
+
+        :param str prefix: Prefix of the metric names.
+        """
+        stats = self.as_dict()
+        lines = [
+            '# HELP {}_phase_seconds Time spent in each phase of the '
+            'configuration manager.'.format(prefix),
+            '# TYPE {}_phase_seconds histogram'.format(prefix),
+        ]
+        for phase in sorted(stats['phases']):
+            labels = stats['phases'][phase]
+            for label in sorted(labels, key=_sort_key):
+                histogram = labels[label]
+                common = 'phase="{}",label="{}"'.format(
+                    _escape(phase), _escape(label)
+                )
+
+                cumulative = 0
+                bounds = [repr(bound) for bound in BUCKETS] + ['+Inf']
+                template = '{}_phase_seconds_bucket{{{},le="{}"}} {}'
+                for bound, observations in zip(bounds, histogram['buckets']):
+                    cumulative += observations
+                    lines.append(template.format(
+                        prefix, common, bound, cumulative
+                    ))
+                lines.append('{}_phase_seconds_sum{{{}}} {!r}'.format(
+                    prefix, common, histogram['sum']
+                ))
+                lines.append('{}_phase_seconds_count{{{}}} {}'.format(
+                    prefix, common, histogram['count']
+                ))
+
+        lines.extend([
+            '# HELP {}_events_total Events of the configuration '
+            'manager.'.format(prefix),
+            '# TYPE {}_events_total counter'.format(prefix),
+        ])
+        template = '{}_events_total{{event="{}",label="{}"}} {}'
+        for counter in sorted(stats['counters']):
+            labels = stats['counters'][counter]
+            for label in sorted(labels, key=_sort_key):
+                lines.append(template.format(
+                    prefix, _escape(counter), _escape(label), labels[label]
+                ))
+
+        return '\n'.join(lines) + '\n'
+
+
+def _sort_key(label):
+    """
+    Sort key of labels, which can be ``None``.
+    """
+    return '' if label is None else label
+
+
+def _escape(value):
+    """
+    Escape a Prometheus label value.
+    """
+    if value is None:
+        return ''
+    return str(value).replace('\\', '\\\\').replace(
+        '"', '\\"'
+    ).replace('\n', '\\n')
@@ -21,8 +21,59 @@ Module for utility functions.
 
 from __future__ import absolute_import, division, print_function
 
+import os
+from binascii import hexlify
+from os.path import basename, dirname, exists, join, realpath
 
-__all__ = ['first_line']
+
+__all__ = ['first_line', 'atomic_write', 'iter_lines', 'read_text']
+
+
+FSYNC_POLICIES = ('never', 'file', 'directory')
+"""
+Policies supported by :func:`atomic_write`.
+"""
+
+_replace = getattr(os, 'replace', os.rename)
+
+try:
+    _text_type = unicode  # noqa
+except NameError:
+    _text_type = str
+
+
+class _LazyLogging(object):
+    """
+    Stand-in for the :py:mod:`logging` module, which is imported the first
+    time it's used, as it's only needed to report errors.
+    """
+
+    def __getattr__(self, name):
+        import logging
+        return getattr(logging, name)
+
+
+log = _LazyLogging()
+
+
+def format_exc():
+    """
+    :py:func:`traceback.format_exc`, imported the first time it's used.
+    """
+    from traceback import format_exc
+    return format_exc()
+
+
+def iscoroutinefunction(func):
+    """
+    :py:func:`inspect.iscoroutinefunction`, imported the first time it's used.
+    Always ``False`` on interpreters without coroutines.
+    """
+    try:
+        from inspect import iscoroutinefunction
+    except ImportError:
+        return False
+    return iscoroutinefunction(func)
 
 
 def first_line(text):
@@ -45,3 +96,156 @@ def first_line(text):
     :rtype: The first line in the text.
     """
     return text.strip().split('\n')[0].strip()
+
+
+def iter_lines(source, encoding='utf-8'):
+    """
+    Iterate the lines of a configuration source.
+
+    >>> from confspec.utils import iter_lines
+    >>> list(iter_lines('[general]\\nkey = value\\n'))
+    ['[general]\\n', 'key = value\\n']
+    >>> list(iter_lines([b'[general]', b'key = value']))
+    ['[general]', 'key = value']
+
+    Strings are split lazily and file objects are read line by line, so at
+    most one line is held in memory by the iteration.
+
+    :param source: A string, a text or binary file object or any iterable of
+     lines.
+    :param str encoding: Encoding used to decode binary lines.
+    :rtype: An iterator of text lines. Line terminators are kept as found in
+     the source.
+    """
+    if isinstance(source, bytes):
+        source = source.decode(encoding)
+    if isinstance(source, _text_type):
+        return _split_lines(source)
+    return _decode_lines(source, encoding)
+
+
+def _split_lines(string):
+    """
+    Iterate the lines of a string without making a copy of it.
+    """
+    start = 0
+    while True:
+        end = string.find('\n', start) + 1
+        if not end:
+            if start < len(string):
+                yield string[start:]
+            return
+        yield string[start:end]
+        start = end
+
+
+def _decode_lines(lines, encoding):
+    """
+    Iterate the given lines decoding binary ones.
+    """
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode(encoding)
+        yield line
+
+
+def read_text(source, encoding='utf-8'):
+    """
+    Read a whole configuration source as text.
+
+    :param source: A string, a text or binary file object or any iterable of
+     lines. See :func:`iter_lines`.
+    :param str encoding: Encoding used to decode binary data.
+    :rtype: The text in the source.
+    """
+    if isinstance(source, bytes):
+        return source.decode(encoding)
+    if isinstance(source, _text_type):
+        return source
+    if hasattr(source, 'read'):
+        text = source.read()
+        if isinstance(text, bytes):
+            text = text.decode(encoding)
+        return text
+    return ''.join(_decode_lines(source, encoding))
+
+
+def _copy_stat(fd, path, stat):
+    """
+    Copy the owner, group and permissions of a file to the open file
+    descriptor of the given path.
+    """
+    # Only privileged users can give files away, keep the current owner
+    # otherwise
+    if hasattr(os, 'fchown'):
+        try:
+            os.fchown(fd, stat.st_uid, stat.st_gid)
+        except OSError:
+            pass
+
+    mode = stat.st_mode & 0o7777
+    if hasattr(os, 'fchmod'):
+        os.fchmod(fd, mode)
+    else:
+        os.chmod(path, mode)
+
+
+def atomic_write(path, data, fsync='file'):
+    """
+    Write a text to a file atomically.
+
+    The text is written to a temporary sibling file, which is then renamed to
+    replace the given path. Readers will see either the old or the new content
+    of the file, but never a truncated file. If the file exists its
+    permissions, and its owner when possible, are preserved. If the path is a
+    symbolic link, the file it points to is replaced and the link is kept.
+
+    :param str path: Path of the file to write.
+    :param str data: Text to write.
+    :param str fsync: Durability policy. One of:
+
+     - ``'never'``: do not call :py:func:`os.fsync`. The new content may be
+       lost in case of a system crash, but the file will never be truncated.
+     - ``'file'``: flush the temporary file to disk before renaming it.
+     - ``'directory'``: like ``'file'``, and also flush the directory after
+       renaming so the rename itself survives a system crash.
+    """
+    if fsync not in FSYNC_POLICIES:
+        raise ValueError('Unknown fsync policy \'{}\''.format(fsync))
+
+    # Replace the target of symbolic links, not the links themselves
+    path = realpath(path)
+    directory = dirname(path)
+    tmp = join(directory, '.{}.{}.tmp'.format(
+        basename(path), hexlify(os.urandom(6)).decode('ascii')
+    ))
+
+    # Give the temporary file the permissions and owner of the file before
+    # writing to it, so the content is never readable by others
+    stat = None
+    mode = 0o666
+    if exists(path):
+        stat = os.stat(path)
+        mode = 0o600
+
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, mode)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            if stat is not None:
+                _copy_stat(f.fileno(), tmp, stat)
+            f.write(data)
+            if fsync != 'never':
+                f.flush()
+                os.fsync(f.fileno())
+        _replace(tmp, path)
+    except Exception:
+        if exists(tmp):
+            os.remove(tmp)
+        raise
+
+    if fsync == 'directory':
+        dirfd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dirfd)
+        finally:
+            os.close(dirfd)
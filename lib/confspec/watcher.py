@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""
+Module for the file stack watcher.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import os
+import sys
+import errno
+import logging as log
+from time import time
+from struct import unpack_from
+from select import select
+from traceback import format_exc
+from threading import Thread, Event
+from os.path import dirname, isdir, join, realpath
+
+try:
+    from time import monotonic
+except ImportError:
+    monotonic = time
+
+
+__all__ = ['FileWatcher']
+
+
+class FileWatcher(object):
+    """
+    Watcher that reloads the files of a configuration manager when they
+    change.
+
+    Changes are detected using inotify when available (Linux), or by polling
+    the files stat information otherwise. When polling, the interval starts
+    at ``min_interval`` and grows up to ``max_interval`` while the files
+    don't change.
+
+    Editors usually perform several writes when saving a file, so changes are
+    debounced: files are reloaded once no change has been detected for
+    ``debounce`` seconds. Only the files that actually changed are imported,
+    see :meth:`confspec.manager.ConfigMg.reload`, and the registered listeners
+    are notified of the changes as usual.
+
+    The watcher runs in a background thread, use :meth:`start` and
+    :meth:`stop` to control it.
+
+    :param ConfigMg cfmg: The Config Manager object whose files are watched.
+     See :class:`confspec.manager.ConfigMg`.
+    :param float debounce: Seconds without changes to wait before reloading.
+    :param float min_interval: Minimum polling interval, in seconds.
+    :param float max_interval: Maximum polling interval, in seconds.
+    :param bool inotify: Use inotify if available. If ``False``, always
+     poll.
+    """
+
+    def __init__(
+            self, cfmg, debounce=0.2, min_interval=0.5, max_interval=5.0,
+            inotify=True):
+        self._cfmg = cfmg
+        self._schedule = _Schedule(debounce, min_interval, max_interval)
+        self._use_inotify = inotify
+
+        self._detector = None
+        self._stopping = Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        """
+        ``True`` if the watcher thread is running.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """
+        Start watching the files in a background thread.
+        """
+        if self.running:
+            raise RuntimeError('Watcher is already running.')
+
+        self._detector = _detector(self._cfmg._files, self._use_inotify)
+        self._stopping.clear()
+        self._thread = Thread(target=self._run, name='confspec-watcher')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop watching the files and wait for the watcher thread to finish.
+        """
+        if self._thread is None:
+            return
+
+        self._stopping.set()
+        self._detector.wake()
+        self._thread.join()
+        self._thread = None
+
+        self._detector.close()
+        self._detector = None
+
+    def _run(self):
+        """
+        Watcher thread main loop.
+        """
+        detector = self._detector
+        schedule = self._schedule
+        blocking = detector.blocking
+
+        while not self._stopping.is_set():
+            changed = detector.wait(schedule.timeout(blocking))
+            if self._stopping.is_set():
+                break
+            if schedule.step(changed):
+                try:
+                    self._cfmg.reload()
+                except Exception:
+                    log.error(format_exc())
+
+
+class _Schedule(object):
+    """
+    Debounce and adaptive polling interval logic shared by the watchers.
+    """
+
+    def __init__(self, debounce, min_interval, max_interval):
+        self.debounce = debounce
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+
+        self.interval = min_interval
+        self.pending = None
+
+    def timeout(self, blocking):
+        """
+        Seconds to wait for changes, or ``None`` to wait indefinitely.
+
+        :param bool blocking: If the change detector can block until a change
+         happens (no polling required).
+        """
+        if self.pending is not None:
+            return max(0.0, self.pending + self.debounce - monotonic())
+        if blocking:
+            return None
+        return self.interval
+
+    def step(self, changed):
+        """
+        Update the schedule after waiting for changes.
+
+        :param bool changed: If changes were detected while waiting.
+        :rtype: ``True`` if the files must be reloaded now.
+        """
+        if changed:
+            self.pending = monotonic()
+            self.interval = self.min_interval
+            return False
+
+        if self.pending is None:
+            self.interval = min(self.interval * 2, self.max_interval)
+            return False
+
+        if monotonic() >= self.pending + self.debounce:
+            self.pending = None
+            return True
+        return False
+
+
+def _detector(files, inotify=True):
+    """
+    Create the best change detector available for the given files.
+    """
+    if inotify:
+        try:
+            return _InotifyDetector(files)
+        except (OSError, AttributeError, ImportError):
+            log.debug('inotify not available, polling files.')
+    return _PollDetector(files)
+
+
+class _PollDetector(object):
+    """
+    Change detector that polls the stat information of the files.
+    """
+
+    blocking = False
+
+    def __init__(self, files):
+        from .manager import _stat
+
+        self._stat = _stat
+        self._files = list(files)
+        self._stats = [_stat(fn) for fn in self._files]
+        self._wakeup = Event()
+
+    def check(self):
+        """
+        Check if any file changed since the last check.
+        """
+        stats = [self._stat(fn) for fn in self._files]
+        changed = stats != self._stats
+        self._stats = stats
+        return changed
+
+    def wait(self, timeout):
+        """
+        Wait ``timeout`` seconds and check if any file changed.
+        """
+        self._wakeup.wait(timeout)
+        return self.check()
+
+    def wake(self):
+        self._wakeup.set()
+
+    def close(self):
+        pass
+
+
+class _InotifyDetector(object):
+    """
+    Change detector that uses Linux inotify on the directories of the files
+    and of the targets of the files that are symbolic links.
+    """
+
+    blocking = True
+
+    # Watched events: IN_MODIFY, IN_ATTRIB, IN_CLOSE_WRITE, IN_MOVED_FROM,
+    # IN_MOVED_TO, IN_CREATE and IN_DELETE
+    _mask = 0x002 | 0x004 | 0x008 | 0x040 | 0x080 | 0x100 | 0x200
+
+    def __init__(self, files):
+        if not sys.platform.startswith('linux'):
+            raise OSError(errno.ENOSYS, 'inotify requires Linux.')
+
+        import ctypes
+        from ctypes.util import find_library
+
+        libc = ctypes.CDLL(find_library('c') or 'libc.so.6', use_errno=True)
+        init, add_watch = libc.inotify_init1, libc.inotify_add_watch
+
+        # Files are written to the target of symbolic links, watch both the
+        # links and their targets
+        self._files = set(files)
+        self._files.update([realpath(fn) for fn in self._files])
+        directories = set(dirname(fn) for fn in self._files)
+        for directory in directories:
+            if not isdir(directory):
+                raise OSError(
+                    errno.ENOENT, 'Cannot watch {}.'.format(directory)
+                )
+
+        self._fd = init(os.O_NONBLOCK | getattr(os, 'O_CLOEXEC', 0))
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed.')
+
+        self._directories = {}
+        try:
+            for directory in directories:
+                wd = add_watch(
+                    self._fd, directory.encode(sys.getfilesystemencoding()),
+                    self._mask
+                )
+                if wd < 0:
+                    raise OSError(
+                        ctypes.get_errno(), 'inotify_add_watch failed.'
+                    )
+                self._directories[wd] = directory
+            self._wake_r, self._wake_w = os.pipe()
+        except Exception:
+            os.close(self._fd)
+            raise
+
+    def fileno(self):
+        return self._fd
+
+    def check(self):
+        """
+        Read the pending events and check if any of them affects the files.
+        """
+        changed = False
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except OSError as e:
+                if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    return changed
+                raise
+
+            offset = 0
+            while offset < len(data):
+                wd, mask, cookie, length = unpack_from('iIII', data, offset)
+                name = data[offset + 16:offset + 16 + length].rstrip(b'\0')
+                offset += 16 + length
+
+                directory = self._directories.get(wd)
+                if directory is None:
+                    continue
+                path = join(
+                    directory, name.decode(sys.getfilesystemencoding())
+                )
+                if path in self._files:
+                    changed = True
+
+    def wait(self, timeout):
+        """
+        Wait up to ``timeout`` seconds for events and check if any file
+        changed.
+        """
+        ready = select([self._fd, self._wake_r], [], [], timeout)[0]
+        if self._fd in ready:
+            return self.check()
+        return False
+
+    def wake(self):
+        os.write(self._wake_w, b'x')
+
+    def close(self):
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            os.close(fd)
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""
+Module for the background writeback scheduler.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import atexit
+import logging as log
+from time import time
+from traceback import format_exc
+from threading import Thread, Condition
+
+try:
+    from time import monotonic
+except ImportError:
+    monotonic = time
+
+
+__all__ = ['BackgroundWriter']
+
+
+class BackgroundWriter(object):
+    """
+    Scheduler that performs saves in a background thread.
+
+    Save requests are coalesced: the first request opens a window of
+    ``delay`` seconds and all requests received within it result in a single
+    save. Saves are also rate limited so two saves never start less than
+    ``interval`` seconds apart.
+
+    Pending saves are performed when :meth:`flush` or :meth:`stop` are called.
+    :meth:`stop` is registered to be called at interpreter exit so no write is
+    lost.
+
+    :param function save: Function that performs the save.
+    :param float delay: Seconds to wait for more requests before saving.
+    :param float interval: Minimum number of seconds between two saves.
+    """
+
+    def __init__(self, save, delay=0.1, interval=1.0):
+        self._save = save
+        self._delay = delay
+        self._interval = interval
+
+        self._condition = Condition()
+        self._running = True
+        self._pending = False
+        self._saving = False
+        self._flushing = False
+        self._first_request = None
+        self._last_save = None
+
+        self._thread = Thread(target=self._run, name='confspec-writer')
+        self._thread.daemon = True
+        self._thread.start()
+
+        atexit.register(self.stop)
+
+    def request(self):
+        """
+        Request a save. The save will be performed by the writer thread.
+        """
+        with self._condition:
+            if not self._running:
+                raise RuntimeError('Writer is stopped.')
+            if not self._pending:
+                self._pending = True
+                self._first_request = monotonic()
+                self._condition.notify_all()
+
+    def flush(self):
+        """
+        Perform any pending save immediately and wait for it to finish.
+        """
+        with self._condition:
+            self._flushing = True
+            self._condition.notify_all()
+            while self._pending or self._saving:
+                self._condition.wait()
+            self._flushing = False
+
+    def stop(self):
+        """
+        Perform any pending save and stop the writer thread.
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        self._thread.join()
+
+        # Python 2 can't unregister exit handlers
+        if hasattr(atexit, 'unregister'):
+            atexit.unregister(self.stop)
+
+    def _run(self):
+        """
+        Writer thread main loop.
+        """
+        with self._condition:
+            while True:
+                while self._running and not self._pending:
+                    self._condition.wait()
+
+                if not self._pending:
+                    break
+
+                # Wait for the coalescing window and the rate limit, unless
+                # the save must be done right away
+                if self._running and not self._flushing:
+                    deadline = self._first_request + self._delay
+                    if self._last_save is not None:
+                        deadline = max(
+                            deadline, self._last_save + self._interval
+                        )
+                    remaining = deadline - monotonic()
+                    if remaining > 0:
+                        self._condition.wait(remaining)
+                        continue
+
+                self._pending = False
+                self._saving = True
+                self._condition.release()
+                try:
+                    self._save()
+                except Exception:
+                    log.error(format_exc())
+                finally:
+                    self._condition.acquire()
+                    self._saving = False
+                    self._last_save = monotonic()
+                    self._condition.notify_all()
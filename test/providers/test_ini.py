@@ -21,6 +21,8 @@ Test confspec.providers.ini module.
 
 from __future__ import absolute_import, division, print_function
 
+from io import BytesIO, StringIO
+
 from pytest import raises
 
 from confspec.manager import ConfigMg
@@ -74,3 +76,39 @@ def test_INIFormatProvider():
         if exc is not None:
             with raises(exc):
                 INIFormatProvider.do_import(mgr, bad)
+
+
+def test_INIFormatProvider_sources():
+
+    mgr = ConfigMg(spec)
+
+    sources = [
+        BytesIO(input_str.encode('utf-8')),
+        StringIO(input_str),
+        input_str.encode('utf-8').splitlines(True),
+        input_str.split('\n'),
+    ]
+
+    for source in sources:
+        mgr.set('configint', 3)
+        INIFormatProvider.do_import(mgr, source)
+        assert INIFormatProvider.do_export(mgr) == input_str
+
+
+def test_INIFormatProvider_tokenize():
+
+    source = (
+        '; Comment\n'
+        'orphan = 1\n'
+        '[ section ]\n'
+        '  key =  a = b  \n'
+        'key =\n'
+        '[bad section]\n'
+    )
+    assert list(INIFormatProvider._tokenize(source)) == [
+        (2, 'general', 'orphan', '1'),
+        (3, 'section', None, None),
+        (4, 'section', 'key', 'a = b'),
+        (5, 'section', None, 'key ='),
+        (6, 'section', None, '[bad section]'),
+    ]
@@ -21,9 +21,17 @@ Test confspec.providers module.
 
 from __future__ import absolute_import, division, print_function
 
+import os
+import sys
+import subprocess
+
 from pytest import raises
 
-from confspec.providers import FormatProvider
+from confspec.manager import ConfigMg
+from confspec.options import ConfigInt
+from confspec import providers as providers_module
+from confspec.providers import FormatProvider, ProviderRegistry, providers
+from confspec.providers.ini import INIFormatProvider
 
 
 def test_FormatProvider():
@@ -32,3 +40,86 @@ def test_FormatProvider():
         FormatProvider.do_import(None, None)
     with raises(NotImplementedError):
         FormatProvider.do_export(None)
+
+
+def test_FormatProvider_rendered():
+
+    mgr = ConfigMg([
+        ConfigInt(key='first', default=1),
+        ConfigInt(key='second', default=2),
+    ])
+
+    rendered = []
+
+    class CountingProvider(INIFormatProvider):
+
+        @classmethod
+        def _render(cls, option):
+            rendered.append(option.key)
+            return super(CountingProvider, cls)._render(option)
+
+    output = CountingProvider.do_export(mgr)
+    assert output == INIFormatProvider.do_export(mgr)
+    assert rendered == ['first', 'second']
+
+    # Only options with new values are rendered again
+    mgr.set('second', 20)
+    output = CountingProvider.do_export(mgr)
+    assert 'second = 20' in output
+    assert rendered == ['first', 'second', 'second']
+
+
+class EntryPoint(object):
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+
+def test_ProviderRegistry(monkeypatch):
+
+    entry_points = [
+        EntryPoint('ini', 'nowhere:Nothing'),
+        EntryPoint('ep', 'confspec.providers.json:JSONFormatProvider'),
+    ]
+    monkeypatch.setattr(
+        providers_module, '_entry_points', lambda: entry_points
+    )
+
+    registry = ProviderRegistry()
+    registry.register('ini', 'confspec.providers.ini:INIFormatProvider')
+    assert registry['ini'] is INIFormatProvider
+    assert not registry._discovered
+
+    # Entry points are discovered on unknown formats, and never override
+    # registered formats
+    assert 'ep' in registry
+    assert registry['ini'] is INIFormatProvider
+    assert sorted(registry) == ['ep', 'ini']
+    with raises(KeyError):
+        registry['unknown']
+
+    # Late registrations are supported formats
+    class MyFormatProvider(FormatProvider):
+        pass
+
+    assert 'mine' not in ConfigMg.supported_formats
+    providers['mine'] = MyFormatProvider
+    try:
+        assert 'mine' in ConfigMg.supported_formats
+        ConfigMg([ConfigInt(key='key', default=1)], format='mine', load=False)
+    finally:
+        del providers['mine']
+    assert 'mine' not in ConfigMg.supported_formats
+
+    assert providers_module.DictFormatProvider is providers['dict']
+
+    # Importing a built-in provider doesn't override a user registration
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    subprocess.check_call([sys.executable, '-c', (
+        'from confspec.providers import FormatProvider, providers\n'
+        'class Mine(FormatProvider): pass\n'
+        'providers["ini"] = Mine\n'
+        'from confspec.providers import INIFormatProvider\n'
+        'import confspec.providers.ini\n'
+        'assert providers["ini"] is Mine\n'
+    )], env=env)
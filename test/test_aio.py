@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+
+"""
+Test confspec.aio module.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import asyncio
+from time import sleep
+from threading import Event, Thread
+
+from confspec.manager import ConfigMg
+from confspec.options import ConfigInt
+
+
+def test_async_api(tmpdir):
+
+    conffile = tmpdir.join('conf.ini')
+    conffile.write('[general]\nvalue = 1\n')
+    mgr = ConfigMg(
+        [ConfigInt(key='value', default=0)],
+        files=[str(conffile)], load=False, notify=True, safe=False
+    )
+
+    events = []
+
+    async def listener(key, old_value, value):
+        await asyncio.sleep(0)
+        events.append((key, old_value, value, asyncio.get_running_loop()))
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        assert mgr.register_listener(listener, 'value')
+
+        await mgr.aload()
+        assert mgr.get('value') == 1
+        await asyncio.sleep(0.05)
+        assert events == [('value', 0, '1', loop)]
+
+        # Coroutine listeners are scheduled, not run inline
+        await mgr.aset('value', 2)
+        assert 'value = 2' in conffile.read()
+        assert len(events) == 1
+        await asyncio.sleep(0.05)
+        assert events[-1] == ('value', 1, 2, loop)
+
+        # Changes from other threads run listeners in the bound loop
+        thread = Thread(target=mgr.set, args=('value', 3))
+        thread.start()
+        await loop.run_in_executor(None, thread.join)
+        await asyncio.sleep(0.05)
+        assert events[-1] == ('value', 2, 3, loop)
+
+        conffile.write('')
+        await mgr.asave()
+        assert 'value = 3' in conffile.read()
+
+    asyncio.run(run())
+
+
+def test_aset_contention():
+
+    mgr = ConfigMg([ConfigInt(key='value', default=0)], load=False)
+    ready = Event()
+
+    # A transaction in another thread holds the lock for a while
+    def hold():
+        with mgr.transaction():
+            mgr.set('value', 1)
+            ready.set()
+            sleep(0.3)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        thread = Thread(target=hold)
+        thread.start()
+        await loop.run_in_executor(None, ready.wait)
+
+        # aset() waits for the lock without stalling the event loop
+        started = loop.time()
+        ticks = []
+
+        async def ticker():
+            while loop.time() - started < 0.2:
+                ticks.append(loop.time())
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(mgr.aset('value', 2), ticker())
+        assert len(ticks) > 5
+        assert mgr.get('value') == 2
+        await loop.run_in_executor(None, thread.join)
+
+    asyncio.run(run())
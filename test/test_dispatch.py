@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+
+"""
+Test confspec.dispatch module.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import gc
+import weakref
+from time import sleep, time
+from threading import Event
+
+from confspec.manager import ConfigMg
+from confspec.options import ConfigInt
+
+
+def test_listener_dispatch():
+
+    mgr = ConfigMg(
+        [ConfigInt(key='a', default=0), ConfigInt(key='b', default=0)],
+        load=False, notify=True
+    )
+    mgr.enable_listener_dispatch(True, workers=4, timeout=0.2)
+
+    events = []
+    release = Event()
+
+    def slow(key, old_value, value):
+        release.wait(5)
+        events.append((key, value))
+
+    def fast(key, old_value, value):
+        events.append((key, value))
+
+    def hung(key, old_value, value):
+        sleep(0.5)
+
+    mgr.register_listener(slow, 'a')
+    mgr.register_listener(fast, 'b')
+
+    # Slow listeners don't delay set(), nor listeners of other keys
+    start = time()
+    for value in range(1, 4):
+        mgr.set('a', value)
+    mgr.set('b', 1)
+    assert time() - start < 0.1
+    assert not mgr.wait_for_listeners(0.05)
+    assert events == [('b', 1)]
+
+    # The listeners of a key are called in order
+    release.set()
+    assert mgr.wait_for_listeners(5)
+    assert [e for e in events if e[0] == 'a'] == [
+        ('a', 1), ('a', 2), ('a', 3)
+    ]
+
+    # Listeners that time out don't block their key
+    mgr.register_listener(hung, 'b')
+    mgr.set('b', 2)
+    mgr.set('b', 3)
+    assert mgr.wait_for_listeners(5)
+    assert events[-2:] == [('b', 2), ('b', 3)]
+
+    metrics = mgr.listener_metrics()
+    assert metrics['dispatched'] == 8
+    assert metrics['completed'] == 6
+    assert metrics['timeouts'] == 2
+    assert metrics['pending'] == 0
+
+    mgr.enable_listener_dispatch(False)
+    assert mgr.listener_metrics() is None
+
+    # Disabled dispatchers are released, they're no longer stopped at exit
+    mgr.enable_listener_dispatch(True)
+    ref = weakref.ref(mgr._dispatcher)
+    mgr.enable_listener_dispatch(False)
+    gc.collect()
+    assert ref() is None
+
+
+def test_listener_dispatch_hung():
+
+    mgr = ConfigMg(
+        [ConfigInt(key='a', default=0), ConfigInt(key='b', default=0)],
+        load=False, notify=True
+    )
+    mgr.enable_listener_dispatch(True, workers=2, timeout=0.1)
+
+    got = []
+    release = Event()
+
+    def hung(key, old_value, value):
+        release.wait(5)
+
+    def fast(key, old_value, value):
+        got.append(value)
+
+    mgr.register_listener(hung, 'a')
+    mgr.register_listener(fast, 'b')
+
+    # Hung listeners don't starve the listeners of other keys
+    mgr.set('a', 1)
+    mgr.set('a', 2)
+    sleep(0.3)
+    for value in range(1, 6):
+        mgr.set('b', value)
+    assert mgr.wait_for_listeners(5)
+    release.set()
+
+    assert got == [1, 2, 3, 4, 5]
+    metrics = mgr.listener_metrics()
+    assert metrics['completed'] == 5
+    assert metrics['timeouts'] == 2
+
+    mgr.enable_listener_dispatch(False)
+
+
+def test_listener_dispatch_stopped():
+
+    mgr = ConfigMg([ConfigInt(key='a', default=0)], load=False, notify=True)
+    mgr.enable_listener_dispatch(True)
+
+    events = []
+
+    def listener(key, old_value, value):
+        events.append(value)
+
+    mgr.register_listener(listener, 'a')
+
+    # Changes made after the dispatcher stopped, e.g. at exit, are delivered
+    # in the calling thread
+    mgr._dispatcher.stop()
+    mgr.set('a', 1)
+    assert events == [1]
+
+    mgr.enable_listener_dispatch(False)
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+
+"""
+Test confspec.locking module.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from threading import Event, Thread
+
+from pytest import raises
+
+from confspec.locking import RWLock
+
+
+def test_RWLock():
+
+    lock = RWLock()
+
+    # Non-blocking acquisition of a free lock
+    assert lock.acquire_write(blocking=False)
+    lock.release_write()
+
+    # Reentrancy
+    with lock.write:
+        assert lock.is_writing()
+        with lock.write:
+            with lock.read:
+                pass
+        assert lock.is_writing()
+    assert not lock.is_writing()
+
+    # Upgrades are refused
+    with lock.read:
+        with raises(RuntimeError):
+            lock.acquire_write()
+
+    with raises(RuntimeError):
+        lock.release_write()
+    with raises(RuntimeError):
+        lock.release_read()
+
+    # Readers run concurrently
+    inside = Event()
+    leave = Event()
+
+    def reader():
+        with lock.read:
+            inside.set()
+            leave.wait(5)
+
+    thread = Thread(target=reader)
+    thread.start()
+    assert inside.wait(5)
+    with lock.read:
+        pass
+
+    # Non-blocking writers don't wait for readers
+    assert not lock.acquire_write(blocking=False)
+
+    # Writers wait for readers, and new readers wait for writers
+    events = []
+
+    def writer():
+        with lock.write:
+            events.append('write')
+
+    def late_reader():
+        with lock.read:
+            events.append('read')
+
+    threads = [Thread(target=writer)]
+    threads[0].start()
+    while not lock._waiting_writers:
+        pass
+    threads.append(Thread(target=late_reader))
+    threads[1].start()
+    assert events == []
+
+    leave.set()
+    for t in [thread] + threads:
+        t.join(5)
+    assert events == ['write', 'read']
@@ -20,3 +20,522 @@ Test confspec.manager module.
 """
 
 from __future__ import absolute_import, division, print_function
+
+from threading import Thread
+
+from pytest import raises
+
+from confspec.manager import ConfigMg
+from confspec.options import ConfigInt, ConfigLine, ConfigMap
+from confspec.validation import positive
+from confspec.providers import FormatProvider, providers
+
+
+def make_spec():
+    return [
+        ConfigLine(
+            key='host',
+            default='localhost',
+            category='server',
+            comment='Server host.',
+        ),
+        ConfigInt(
+            key='port',
+            default=8080,
+            validator=positive(),
+            category='server',
+            comment='Server port.',
+        ),
+    ]
+
+
+def test_transaction(tmpdir):
+
+    conffile = tmpdir.join('conf.ini')
+    mgr = ConfigMg(make_spec(), files=[str(conffile)], notify=True)
+
+    saves = []
+    save = mgr.save
+
+    def counting_save():
+        saves.append(True)
+        save()
+
+    mgr.save = counting_save
+
+    events = []
+    mgr.register_listener(lambda *args: events.append(args), 'host')
+    mgr.register_listener(lambda *args: events.append(args), 'port')
+
+    # Commit writes once and notifies once per changed key
+    with mgr.transaction():
+        mgr.set('host', 'example.com')
+        mgr.set('port', 9000)
+        mgr.set('port', 9090)
+        assert events == []
+        assert saves == []
+
+    assert len(saves) == 1
+    assert events == [
+        ('host', 'localhost', 'example.com'),
+        ('port', 8080, 9090),
+    ]
+    assert 'port = 9090' in conffile.read()
+
+    # A failing set rolls back every staged value
+    del events[:]
+    with raises(ValueError):
+        with mgr.transaction():
+            mgr.set('host', 'other.com')
+            mgr.set('port', -1)
+
+    assert mgr.get('host') == 'example.com'
+    assert mgr.get('port') == 9090
+    assert len(saves) == 1
+    assert events == []
+
+    # Explicit API
+    mgr.begin()
+    with raises(RuntimeError):
+        mgr.begin()
+    mgr.set('port', 3)
+    mgr.rollback()
+    assert mgr.get('port') == 9090
+
+    with raises(RuntimeError):
+        mgr.commit()
+
+    # Listeners get the value as given to set(), as outside transactions
+    del events[:]
+    with mgr.transaction():
+        mgr.set('port', '10')
+        mgr.set('port', '30')
+    mgr.set('port', '40')
+    assert events == [('port', 9090, '30'), ('port', 30, '40')]
+
+
+def test_background_writeback(tmpdir):
+
+    conffile = tmpdir.join('conf.ini')
+    mgr = ConfigMg(make_spec(), files=[str(conffile)])
+    mgr.enable_background_writeback(True, delay=10.0)
+
+    for port in range(1, 100):
+        mgr.set('port', port)
+    assert 'port = 8080' in conffile.read()
+
+    mgr.flush()
+    assert 'port = 99' in conffile.read()
+
+    # Disabling background writeback writes pending changes
+    mgr.set('port', 3)
+    mgr.enable_background_writeback(False)
+    assert 'port = 3' in conffile.read()
+
+
+def test_reload(tmpdir):
+
+    system = tmpdir.join('system.ini')
+    user = tmpdir.join('user.ini')
+    system.write('[server]\nhost = system.com\nport = 1\n')
+    user.write('[server]\nport = 2\n')
+
+    mgr = ConfigMg(make_spec(), files=[str(system), str(user)])
+    assert mgr.get('host') == 'system.com'
+    assert mgr.get('port') == 2
+
+    # Nothing changed
+    assert mgr.reload() == []
+
+    # Touching a file without changing its content doesn't import it
+    user.setmtime(user.mtime() + 10)
+    assert mgr.reload() == []
+
+    # A changed file is imported again
+    user.write('[server]\nport = 3\n')
+    assert mgr.reload() == [str(user)]
+    assert mgr.get('port') == 3
+
+    # Files after a changed file are imported again to keep precedence
+    system.write('[server]\nhost = other.com\nport = 4\n')
+    assert mgr.reload() == [str(system), str(user)]
+    assert mgr.get('host') == 'other.com'
+    assert mgr.get('port') == 3
+
+    # Saved files are not imported again
+    mgr.set('port', 5)
+    assert mgr.reload() == []
+
+
+def test_parallel_load(tmpdir):
+
+    layers = [tmpdir.join('layer{}.ini'.format(i)) for i in range(4)]
+    layers[0].write('[server]\nhost = system.com\nport = 1\n')
+    layers[1].write('[server]\nport = -1\n')
+    layers[2].write('[server]\nport = 3\n')
+    files = [str(layer) for layer in layers]
+
+    def load(parallel, **kwargs):
+        mgr = ConfigMg(make_spec(), files=files, load=False, **kwargs)
+        mgr.enable_parallel_load(parallel)
+        batches = []
+        mgr.register_batch_listener(lambda *args: batches.append(args))
+        mgr.load()
+        return mgr, batches
+
+    # Same result as a sequential load, last file wins
+    sequential, expected = load(False, create=False)
+    mgr, batches = load(True, create=False)
+    assert mgr.get('host') == 'system.com'
+    assert mgr.get('port') == 3
+    assert batches == expected
+    assert mgr._fingerprints == sequential._fingerprints
+
+    # Missing files are created in stack order
+    mgr, batches = load(True)
+    assert 'port = 3' in layers[3].read()
+    assert mgr.reload() == []
+
+    # Errors are raised in stack order
+    with raises(ValueError):
+        load(True, create=False, safe=False)
+
+    # Providers that import by themselves are loaded sequentially
+    class MyFormatProvider(FormatProvider):
+        @staticmethod
+        def do_import(cfmg, source):
+            providers['ini'].do_import(cfmg, source)
+
+    providers['mine'] = MyFormatProvider
+    try:
+        mgr, batches = load(True, create=False, format='mine')
+        assert mgr.get('port') == 3
+    finally:
+        del providers['mine']
+
+
+def test_get_proxy():
+
+    mgr = ConfigMg(make_spec())
+
+    for fast in [False, True]:
+        conf = mgr.get_proxy(fast=fast)
+        assert conf is mgr.get_proxy(fast=fast)
+
+        conf.port = '81'
+        assert conf.port == 81
+        assert mgr.get('port') == 81
+        assert conf.host == 'localhost'
+        assert repr(conf) == repr(mgr)
+
+        with raises(ValueError):
+            conf.port = -1
+        with raises(TypeError):
+            del conf.port
+
+    conf = mgr.get_proxy(fast=True)
+    with raises(AttributeError):
+        conf.unknown
+    with raises(AttributeError):
+        conf.unknown = 1
+
+    # Options overriding the value property
+    mgr = ConfigMg([
+        ConfigMap(key='level', default='low', table={'low': 1, 'high': 2})
+    ])
+    conf = mgr.get_proxy(fast=True)
+    assert conf.level == 1
+    conf.level = 'high'
+    assert conf.level == 2
+
+
+def test_snapshot():
+
+    mgr = ConfigMg(make_spec())
+    snapshot = mgr.snapshot()
+    assert snapshot is mgr.snapshot()
+    assert dict(snapshot) == {'host': 'localhost', 'port': 8080}
+    assert hash(snapshot) == hash(mgr.snapshot())
+    with raises(TypeError):
+        snapshot.port = 1
+
+    # Each set swaps a new snapshot
+    mgr.set('port', 1)
+    assert snapshot.port == 8080
+    assert mgr.snapshot().port == 1
+    assert mgr.snapshot().generation == snapshot.generation + 1
+
+    # Transactions and imports are published at once
+    snapshot = mgr.snapshot()
+    with mgr.transaction():
+        mgr.set('host', 'example.com')
+        mgr.set('port', 2)
+        assert mgr.snapshot() is snapshot
+    assert mgr.snapshot().generation == snapshot.generation + 1
+    assert dict(mgr.snapshot()) == {'host': 'example.com', 'port': 2}
+
+    snapshot = mgr.snapshot()
+    mgr.do_import('[server]\nhost = other.com\nport = 3\n')
+    assert mgr.snapshot().generation == snapshot.generation + 1
+    assert dict(mgr.snapshot()) == {'host': 'other.com', 'port': 3}
+
+    # Rolled back transactions are never published
+    snapshot = mgr.snapshot()
+    with raises(ValueError):
+        with mgr.transaction():
+            mgr.set('port', 4)
+            mgr.set('port', -4)
+    assert mgr.snapshot() is snapshot
+
+
+def test_threads():
+
+    mgr = ConfigMg(make_spec(), load=False)
+    errors = []
+
+    def writer():
+        for port in range(1, 201):
+            with mgr.transaction():
+                mgr.set('host', 'host{}'.format(port))
+                mgr.set('port', port)
+
+    def reader():
+        # Snapshots are always consistent
+        for i in range(200):
+            snapshot = mgr.snapshot()
+            if snapshot.port != 8080 and \
+                    snapshot.host != 'host{}'.format(snapshot.port):
+                errors.append(dict(snapshot))
+            mgr.do_export()
+
+    threads = [Thread(target=writer)] + [
+        Thread(target=reader) for i in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert mgr.get('port') == 200
+
+    # Transactions belong to the thread that began them
+    mgr.begin()
+    thread = Thread(target=lambda: errors.append(raises(
+        RuntimeError, mgr.commit
+    )))
+    thread.start()
+    thread.join()
+    mgr.rollback()
+    assert len(errors) == 1
+
+
+def test_listener_subscriptions():
+
+    spec = make_spec() + [ConfigLine(key='name', default='app')]
+    mgr = ConfigMg(spec, load=False, notify=True)
+
+    events = []
+
+    def listener(key, old_value, value):
+        events.append(key)
+
+    # Invalid subscriptions
+    assert not mgr.register_listener(listener)
+    assert not mgr.register_listener(listener, 'host', category='server')
+    assert not mgr.register_listener(listener, category='unknown')
+    assert not mgr.register_listener(listener, pattern='nothing*')
+
+    # Overlapping subscriptions notify once
+    assert mgr.register_listener(listener, category='server')
+    assert mgr.register_listener(listener, 'port')
+    assert not mgr.register_listener(listener, category='server')
+    mgr.set('host', 'example.com')
+    mgr.set('port', 1)
+    mgr.set('name', 'other')
+    assert events == ['host', 'port']
+
+    assert mgr.unregister_listener(listener, category='server')
+    assert not mgr.unregister_listener(listener, category='server')
+    del events[:]
+    mgr.set('host', 'localhost')
+    mgr.set('port', 2)
+    assert events == ['port']
+
+    assert mgr.unregister_listener(listener, 'port')
+    assert mgr.register_listener(listener, pattern='*')
+    del events[:]
+    mgr.set('host', 'example.com')
+    mgr.set('name', 'app')
+    assert events == ['host', 'name']
+
+
+def test_batch_listener():
+
+    mgr = ConfigMg(make_spec(), load=False, notify=True)
+
+    batches = []
+
+    def listener(changes, generation):
+        batches.append((dict(changes), generation))
+
+    assert mgr.register_batch_listener(listener)
+    assert not mgr.register_batch_listener(listener)
+
+    # One notification per import, with the parsed values
+    mgr.do_import('[server]\nhost = example.com\nport = 9000\n')
+    assert batches == [({
+        'host': ('localhost', 'example.com'),
+        'port': (8080, 9000),
+    }, 1)]
+
+    # Imports without changes are not notified
+    mgr.do_import('[server]\nport = 9000\n')
+    assert len(batches) == 1
+
+    with mgr.transaction():
+        mgr.set('port', 1)
+        mgr.set('port', 2)
+    mgr.set('host', 'localhost')
+    assert batches[1:] == [
+        ({'port': (9000, 2)}, 2),
+        ({'host': ('example.com', 'localhost')}, 3),
+    ]
+    assert mgr.snapshot().generation == 3
+
+    assert mgr.unregister_batch_listener(listener)
+    mgr.set('port', 3)
+    assert len(batches) == 3
+
+
+def test_atomic_import():
+
+    mgr = ConfigMg(make_spec(), load=False, notify=True, safe=False)
+
+    events = []
+    mgr.register_listener(lambda *args: events.append(args), pattern='*')
+
+    # A value that can't be validated leaves the configuration unchanged
+    with raises(ValueError):
+        mgr.do_import('[server]\nhost = example.com\nport = -1\n')
+    assert mgr.get('host') == 'localhost'
+    assert mgr.get('port') == 8080
+    assert not events
+
+    # Only the keys that change are applied and notified
+    mgr.do_import('[server]\nhost = localhost\nport = 9000\n')
+    assert events == [('port', 8080, '9000')]
+
+    # In safe mode the invalid values are skipped
+    mgr.enable_safe(True)
+    mgr.do_import('[server]\nhost = example.com\nport = -1\n')
+    assert mgr.get('host') == 'example.com'
+    assert mgr.get('port') == 9000
+
+    # Listeners get the same old values as with set()
+    mgr = ConfigMg([
+        ConfigMap(key='level', default='low', table={'low': 1, 'high': 2}),
+    ], load=False, notify=True)
+    events = []
+    batches = []
+    mgr.register_listener(lambda *args: events.append(args), key='level')
+    mgr.register_batch_listener(lambda *args: batches.append(args))
+    mgr.do_import('[general]\nlevel = high\n')
+    assert events == [('level', 1, 'high')]
+    assert batches == [({'level': (1, 2)}, 1)]
+
+
+def test_validate(tmpdir):
+
+    path = str(tmpdir.join('conf.ini'))
+    mgr = ConfigMg(make_spec(), files=[path], create=True, notify=True)
+
+    report = mgr.validate(
+        '[server]\n'
+        'host = example.com\n'
+        'port = -1\n'
+        'bad line\n'
+        '[foo]\n'
+        'bar = 1\n'
+    )
+    assert not report
+    assert [(issue.line, issue.key) for issue in report.errors] == [
+        (4, None), (3, 'port'),
+    ]
+    assert [(issue.line, issue.key) for issue in report.warnings] == [
+        (5, None),
+    ]
+
+    # Nothing was imported
+    assert mgr.get('host') == 'localhost'
+    assert mgr.snapshot().generation == 0
+
+    report = mgr.validate('{"server": {"port": 9000}}', format='json')
+    assert report and not report.warnings
+
+    report = mgr.validate('{"server": ', format='json')
+    assert [issue.line for issue in report.errors] == [1]
+
+    # Documents that can't be decoded are reported
+    report = mgr.validate(b'[server]\nhost = \xff\n')
+    assert len(report.errors) == 1
+    assert report.errors[0].line is None
+
+    # Formats that can't be validated are reported
+    class NoStageFormatProvider(FormatProvider):
+        pass
+
+    providers['nostage'] = NoStageFormatProvider
+    try:
+        report = mgr.validate('', format='nostage')
+        assert len(report.errors) == 1
+    finally:
+        del providers['nostage']
+
+    with raises(AttributeError):
+        mgr.validate('', format='unknown')
+
+
+def test_shared_memory(monkeypatch):
+    from confspec import shm as shm_module
+
+    publisher = ConfigMg(make_spec(), load=False)
+    subscriber = ConfigMg(make_spec(), load=False, notify=True)
+
+    publisher.set('port', 9000)
+    shm = publisher.publish()
+    try:
+        events = []
+        subscriber.register_batch_listener(
+            lambda changes, generation: events.append(dict(changes))
+        )
+        subscriber.subscribe(shm.name)
+        assert subscriber.get('port') == 9000
+        assert events == [{'port': (8080, 9000)}]
+
+        # Nothing to import until the publisher changes
+        assert not subscriber.sync()
+        publisher.do_import('[server]\nhost = example.com\nport = 1\n')
+        assert subscriber.sync()
+        assert not subscriber.sync()
+        assert subscriber.get('host') == 'example.com'
+        assert subscriber.get('port') == 1
+
+        # Subscribers are read-only
+        with raises(RuntimeError):
+            subscriber.set('port', 2)
+
+        # A publisher that dies while writing doesn't hang the subscribers,
+        # which keep the previous configuration
+        monkeypatch.setattr(shm_module, 'READ_TIMEOUT', 0.05)
+        header = shm_module._HEADER
+        sequence, generation, size = header.unpack_from(shm._shm.buf, 0)
+        header.pack_into(shm._shm.buf, 0, sequence + 1, generation + 1, size)
+        subscriber.enable_safe(False)
+        with raises(TimeoutError):
+            subscriber.sync()
+        subscriber.enable_safe(True)
+        assert not subscriber.sync()
+        assert subscriber.get('port') == 1
+    finally:
+        shm.close()
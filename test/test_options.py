@@ -23,6 +23,8 @@ from __future__ import absolute_import, division, print_function
 
 from pytest import raises
 
+from confspec.options import ConfigOpt, ConfigList, ConfigInt, ConfigListInt
+
 from .options import options
 
 
@@ -31,8 +33,54 @@ from .options import options
 # -----------------------------------------------------------------------------
 
 def test_ConfigOpt():
-    # FIXME IMPLEMENT
-    pass
+
+    def even(value):
+        return value % 2 == 0
+
+    def small(value):
+        return value < 10
+
+    # Validators are normalized to a tuple, lists are copied
+    validators = [even, small]
+    opt = ConfigInt(key='number', default=2, validator=validators)
+    validators.append(None)
+    assert opt.validator is validators
+    assert opt._validators == (even, small)
+    assert ConfigInt(key='single', default=2, validator=even)._validators == \
+        (even, )
+    assert ConfigInt(key='none', default=1)._validators == ()
+
+    for value in [3, 12, '3', '12']:
+        with raises(ValueError):
+            opt.value = value
+    opt.value = 4
+    assert opt.value == 4
+
+
+def test_fast_path():
+
+    class ConfigPort(ConfigInt):
+        def parse(self, value):
+            value = super(ConfigPort, self).parse(value)
+            if not 0 < value < 65536:
+                raise ValueError('Invalid port {}.'.format(value))
+            return value
+
+    class ConfigMyInt(ConfigInt):
+        pass
+
+    # Values of the internal type skip parsing only if parse() is the one of
+    # the class that declared the internal type
+    assert ConfigInt._fast_type is int
+    assert ConfigMyInt._fast_type is int
+    assert ConfigPort._fast_type is None
+
+    port = ConfigPort(key='port', default=8080)
+    for value in [70000, '70000']:
+        with raises(ValueError):
+            port.value = value
+    port.value = 443
+    assert port.value == 443
 
 
 def test_ConfigList():
@@ -40,6 +88,26 @@ def test_ConfigList():
     pass
 
 
+def test_slots():
+
+    # Options provided by confspec have no instance dictionary
+    for name, opt in options.items():
+        if opt is not None:
+            assert not hasattr(opt, '__dict__'), name
+
+    # User defined options without slots keep working
+    class ConfigMyInt(ConfigInt):
+        pass
+
+    class ConfigListMyInt(ConfigList, ConfigMyInt):
+        pass
+
+    opt = ConfigListMyInt(key='mylist', default='[1, 0x10]')
+    assert opt.value == [1, 16]
+    assert isinstance(opt, ConfigOpt)
+    assert ConfigListInt(key='ints', default=[1]).value == [1]
+
+
 # -----------------------------------------------------------------------------
 # Entity classes
 # -----------------------------------------------------------------------------
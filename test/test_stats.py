@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+
+"""
+Test confspec.stats module.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from pytest import raises
+
+from confspec.manager import ConfigMg
+from confspec.options import ConfigInt
+from confspec.validation import positive
+
+
+def test_instrumentation(tmpdir):
+
+    conffile = tmpdir.join('conf.ini')
+    conffile.write('[general]\nport = 9000\n')
+    mgr = ConfigMg(
+        [ConfigInt(key='port', default=8080, validator=positive())],
+        files=[str(conffile)], load=False, notify=True, safe=False
+    )
+    assert mgr.instrumentation() is None
+
+    mgr.enable_instrumentation(True)
+    mgr.register_listener(lambda *args: None, 'port')
+    mgr.register_batch_listener(lambda *args: None)
+    mgr.load()
+    mgr.set('port', 1)
+    with raises(ValueError):
+        mgr.set('port', -1)
+
+    stats = mgr.instrumentation().as_dict()
+    phases = stats['phases']
+    assert phases['read'][str(conffile)]['count'] == 1
+    assert phases['import']['ini']['count'] == 1
+    assert phases['parse']['port']['count'] == 3
+    assert phases['validate']['port']['count'] == 3
+    assert phases['listener']['port']['count'] == 2
+    assert phases['batch_listener'][None]['count'] == 2
+    assert phases['export']['ini']['count'] == 1
+    assert phases['write'][str(conffile)]['count'] == 1
+    assert sum(phases['parse']['port']['buckets']) == 3
+    assert stats['counters'] == {
+        'changes': {'port': 2},
+        'errors': {'validate': 1},
+    }
+
+    text = mgr.instrumentation().prometheus()
+    assert '# TYPE confspec_phase_seconds histogram' in text
+    assert (
+        'confspec_phase_seconds_bucket{phase="parse",label="port",le="+Inf"} 3'
+    ) in text
+    assert 'confspec_events_total{event="changes",label="port"} 2' in text
+
+    # Keys can be left out of the labels
+    mgr.enable_instrumentation(True, per_key=False)
+    mgr.set('port', 2)
+    assert mgr.instrumentation().as_dict()['counters'] == {
+        'changes': {None: 1}
+    }
@@ -21,4 +21,89 @@ Test confspec.utils module.
 
 from __future__ import absolute_import, division, print_function
 
-# EMPTY: This module is tested using doctest.
+import os
+import sys
+import subprocess
+
+from pytest import raises
+
+from confspec.utils import atomic_write, iter_lines, read_text
+from confspec.utils import log, format_exc
+
+
+def test_atomic_write(tmpdir, monkeypatch):
+
+    path = str(tmpdir.join('conf.ini'))
+
+    for fsync in ['never', 'file', 'directory']:
+        atomic_write(path, fsync, fsync=fsync)
+        with open(path) as f:
+            assert f.read() == fsync
+
+    # Permissions are preserved
+    os.chmod(path, 0o640)
+    atomic_write(path, 'data')
+    assert os.stat(path).st_mode & 0o777 == 0o640
+
+    # The new content is never readable by others
+    os.chmod(path, 0o600)
+    modes = []
+    fsync = os.fsync
+
+    def spy(fd):
+        modes.append(os.fstat(fd).st_mode & 0o777)
+        fsync(fd)
+
+    monkeypatch.setattr(os, 'fsync', spy)
+    atomic_write(path, 'secret')
+    assert modes == [0o600]
+    assert os.stat(path).st_mode & 0o777 == 0o600
+
+    # No temporary files are left behind
+    assert tmpdir.listdir() == [tmpdir.join('conf.ini')]
+
+    with raises(ValueError):
+        atomic_write(path, 'data', fsync='always')
+
+
+def test_atomic_write_symlink(tmpdir):
+
+    real = tmpdir.mkdir('real').join('app.ini')
+    real.write('old')
+    link = tmpdir.join('link.ini')
+    link.mksymlinkto(real)
+
+    # The target of the link is written and the link is kept
+    atomic_write(str(link), 'new')
+    assert link.islink()
+    assert real.read() == 'new'
+    assert link.read() == 'new'
+    assert sorted(p.basename for p in real.dirpath().listdir()) == ['app.ini']
+
+
+def test_iter_lines():
+
+    # Binary and text strings are split in lines, in both Python 2 and 3
+    for source in [b'[general]\na = 5\n', u'[general]\na = 5\n']:
+        assert list(iter_lines(source)) == [u'[general]\n', u'a = 5\n']
+        assert read_text(source) == u'[general]\na = 5\n'
+
+
+def test_lazy_imports():
+
+    # Importing confspec doesn't load the modules only needed on demand
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    loaded = subprocess.check_output([
+        sys.executable, '-c',
+        'import sys, confspec; print(" ".join(sys.modules))'
+    ], env=env, universal_newlines=True).split()
+    for module in ['ast', 'hashlib', 'inspect', 'logging', 're', 'traceback']:
+        assert module not in loaded
+
+    # The stand-ins behave as the modules they replace
+    import logging
+    assert log.getLogger is logging.getLogger
+    try:
+        raise ValueError('lazy')
+    except ValueError:
+        assert 'ValueError: lazy' in format_exc()
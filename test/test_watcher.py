@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""
+Test confspec.watcher and confspec.aio modules.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import asyncio
+from time import sleep, time
+
+from pytest import mark
+
+from confspec.manager import ConfigMg
+from confspec.options import ConfigInt
+
+
+def make_manager(tmpdir):
+    conffile = tmpdir.join('conf.ini')
+    conffile.write('[general]\nvalue = 1\n')
+    mgr = ConfigMg(
+        [ConfigInt(key='value', default=0)],
+        files=[str(conffile)], notify=True
+    )
+    return mgr, conffile
+
+
+@mark.parametrize('inotify', [True, False])
+def test_FileWatcher(tmpdir, inotify):
+
+    mgr, conffile = make_manager(tmpdir)
+    events = []
+    mgr.register_listener(lambda *args: events.append(args), 'value')
+
+    watcher = mgr.watch(
+        debounce=0.05, min_interval=0.01, max_interval=0.05, inotify=inotify
+    )
+    assert watcher.running
+
+    # A burst of writes results in a single reload
+    for value in range(2, 6):
+        conffile.write('[general]\nvalue = {}\n'.format(value))
+        conffile.setmtime(time() + value)
+
+    deadline = time() + 5
+    while mgr.get('value') != 5 and time() < deadline:
+        sleep(0.01)
+    sleep(0.2)
+
+    watcher.stop()
+    assert not watcher.running
+    assert events == [('value', 1, '5')]
+
+
+@mark.parametrize('inotify', [True, False])
+def test_AsyncFileWatcher(tmpdir, inotify):
+
+    mgr, conffile = make_manager(tmpdir)
+
+    async def run():
+        watcher = mgr.awatch(
+            debounce=0.05, min_interval=0.01, max_interval=0.05,
+            inotify=inotify
+        )
+        await asyncio.sleep(0.05)
+        conffile.write('[general]\nvalue = 2\n')
+        conffile.setmtime(time() + 10)
+
+        deadline = time() + 5
+        while mgr.get('value') != 2 and time() < deadline:
+            await asyncio.sleep(0.01)
+        await watcher.stop()
+        assert not watcher.running
+
+    asyncio.run(run())
+    assert mgr.get('value') == 2
+
+
+@mark.parametrize('inotify', [True, False])
+def test_FileWatcher_symlink(tmpdir, inotify):
+
+    real = tmpdir.mkdir('real').join('app.ini')
+    real.write('[general]\nvalue = 1\n')
+    link = tmpdir.mkdir('etc').join('app.ini')
+    link.mksymlinkto(real)
+    mgr = ConfigMg([ConfigInt(key='value', default=0)], files=[str(link)])
+
+    watcher = mgr.watch(
+        debounce=0.05, min_interval=0.01, max_interval=0.05, inotify=inotify
+    )
+
+    # Changes to the target of symbolic links are detected
+    real.write('[general]\nvalue = 2\n')
+    real.setmtime(time() + 10)
+
+    deadline = time() + 5
+    while mgr.get('value') != 2 and time() < deadline:
+        sleep(0.01)
+
+    watcher.stop()
+    assert mgr.get('value') == 2
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""
+Test confspec.writer module.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import gc
+import weakref
+
+from pytest import raises
+
+from confspec.writer import BackgroundWriter
+
+
+def test_BackgroundWriter():
+
+    saves = []
+    writer = BackgroundWriter(lambda: saves.append(True), delay=10.0)
+
+    # A burst of requests is coalesced into a single save
+    for i in range(50):
+        writer.request()
+    assert saves == []
+    writer.flush()
+    assert len(saves) == 1
+
+    # Nothing pending, nothing to flush
+    writer.flush()
+    assert len(saves) == 1
+
+    # Pending saves are written on stop
+    writer.request()
+    writer.stop()
+    assert len(saves) == 2
+
+    with raises(RuntimeError):
+        writer.request()
+
+    # Stopped writers are released, they're no longer stopped at exit
+    ref = weakref.ref(writer)
+    del writer
+    gc.collect()
+    assert ref() is None